@@ -25,6 +25,10 @@ class RiskScoreCalculator:
             "concentration": 0.15,
             "volatility": 0.10,
         }
+        
+        # Ordre fixe des composantes et vecteur de poids correspondant
+        self._component_names = tuple(self.weights)
+        self._weights_arr = np.array([self.weights[name] for name in self._component_names])
     
     def calculate_global_risk_score(self, metrics):
         """
@@ -50,9 +54,6 @@ class RiskScoreCalculator:
                                              "volatility"]):
                 return {"score": 50, "details": {}, "rating": "Indéterminé", "color": "gray"}
             
-            # Initialiser les scores par composante
-            component_scores = {}
-            
             # 1. Score D-Leverage (0-100, plus haut = plus risqué)
             style = metrics["trading_style"]
             d_leverage = metrics["d_leverage"]
@@ -86,8 +87,6 @@ class RiskScoreCalculator:
             else:
                 d_leverage_score = 100  # Risque maximal
             
-            component_scores["d_leverage"] = d_leverage_score
-            
             # 2. Score VaR (0-100, plus haut = plus risqué)
             var_monthly = metrics["var_monthly"]
             
@@ -110,8 +109,6 @@ class RiskScoreCalculator:
             else:
                 var_score = 100  # Risque maximal
             
-            component_scores["var"] = var_score
-            
             # 3. Score Drawdown (0-100, plus haut = plus risqué)
             drawdown = abs(metrics["max_drawdown"])
             
@@ -134,8 +131,6 @@ class RiskScoreCalculator:
             else:
                 drawdown_score = 100  # Risque maximal
             
-            component_scores["drawdown"] = drawdown_score
-            
             # 4. Score Marge (0-100, plus haut = plus risqué)
             margin_pct = metrics["margin_pct"]
             
@@ -158,14 +153,11 @@ class RiskScoreCalculator:
             else:
                 margin_score = 100  # Risque maximal
             
-            component_scores["margin_pct"] = margin_score
-            
             # 5. Score Concentration (0-100, plus haut = plus risqué)
             concentration = metrics["concentration"]  # HHI normalisé (0-1)
             
             # Conversion linéaire simple en score 0-100
             concentration_score = concentration * 100
-            component_scores["concentration"] = concentration_score
             
             # 6. Score Volatilité (0-100, plus haut = plus risqué)
             volatility = metrics["volatility"]
@@ -189,15 +181,13 @@ class RiskScoreCalculator:
             else:
                 volatility_score = 100  # Risque maximal
             
-            component_scores["volatility"] = volatility_score
-            
-            # Calculer le score global pondéré
-            global_score = 0
-            for component, score in component_scores.items():
-                global_score += score * self.weights.get(component, 0)
+            # Calculer le score global pondéré (ordre de self._component_names)
+            scores = np.array([d_leverage_score, var_score, drawdown_score,
+                               margin_score, concentration_score, volatility_score])
             
             # Arrondir à l'entier le plus proche
-            global_score = round(global_score)
+            global_score = round(float(scores @ self._weights_arr))
+            component_scores = dict(zip(self._component_names, scores.tolist()))
             
             # Déterminer le rating et la couleur
             if global_score < 20:
@@ -10,6 +10,12 @@ import json
 import logging
 from pathlib import Path
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # orjson est optionnel, json.loads accepte aussi des bytes
+    _json_loads = json.loads
+
 class ConfigManager:
     """Classe de gestion de la configuration de l'application"""
     
@@ -62,8 +68,13 @@ class ConfigManager:
         """Charge la configuration depuis le fichier"""
         try:
             if self.config_file.exists():
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    self.config = json.load(f)
+                self.config = _json_loads(self.config_file.read_bytes())
+                
+                # Compléter les sections manquantes avec les valeurs par défaut
+                missing_sections = self.DEFAULT_CONFIG.keys() - self.config.keys()
+                for section in missing_sections:
+                    self.config[section] = dict(self.DEFAULT_CONFIG[section])
+                
                 self.logger.info("Configuration chargée depuis %s", self.config_file)
             else:
                 self.logger.info("Fichier de configuration non trouvé, utilisation des valeurs par défaut")
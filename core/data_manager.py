@@ -7,6 +7,8 @@ Centralise l'accès et la mise à jour des données
 """
 
 import logging
+import threading
+import time
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
@@ -30,6 +32,23 @@ class DataManager:
         self.historical_orders = None
         self.equity_data = None
         
+        # Verrou protégeant le remplacement des données en cache (thread de préchargement)
+        self.lock = threading.Lock()
+        
+        # Verrou empêchant un rafraîchissement complet et un préchargement de se chevaucher
+        self._refresh_lock = threading.Lock()
+        
+        # Numéro de version de chaque jeu de données, incrémenté quand son contenu change
+        self._data_versions = {"account_info": 0, "positions": 0, "historical_deals": 0, "equity": 0}
+        
+        # Historique du D-Leverage partagé par les widgets qui l'affichent,
+        # complété une fois par version des informations du compte et des positions
+        self.d_leverage_history = {"timestamp": [], "value": [], "avg_duration": []}
+        self._d_leverage_history_versions = None
+        
+        # Champs du compte et indicateurs dérivés, calculés une fois par rafraîchissement
+        self.account_snapshot = None
+        
         # État de connexion
         self.connected = False
     
@@ -48,54 +67,209 @@ class DataManager:
         self.mt5_connector.disconnect()
         self.connected = False
     
+    @staticmethod
+    def _same_data(old, new):
+        """Indique si deux versions d'un jeu de données ont le même contenu"""
+        if old is None or new is None:
+            return old is new
+        if isinstance(old, (pd.DataFrame, pd.Series)):
+            return type(old) is type(new) and old.equals(new)
+        return old == new
+    
+    @staticmethod
+    def _same_daily_series(old, new):
+        """Compare deux séries journalières à la date près (l'heure de l'index suit l'heure du calcul)"""
+        if old is None or new is None:
+            return old is new
+        return (old.index.normalize().equals(new.index.normalize())
+                and np.array_equal(old.to_numpy(), new.to_numpy()))
+    
+    def _store(self, attr, key, value, same=None):
+        """
+        Remplace une donnée en cache et incrémente sa version si son contenu a changé
+        
+        Args:
+            attr (str): Nom de l'attribut en cache
+            key (str): Clé du jeu de données dans les versions
+            value: Nouvelle valeur
+            same (callable, optional): Comparaison (ancienne, nouvelle). Si None, _same_data.
+        """
+        same = same or self._same_data
+        with self.lock:
+            if not same(getattr(self, attr), value):
+                self._data_versions[key] += 1
+            setattr(self, attr, value)
+    
+    def get_data_versions(self):
+        """
+        Retourne les numéros de version courants des jeux de données
+        
+        Returns:
+            dict: Clé du jeu de données -> numéro de version
+        """
+        with self.lock:
+            return dict(self._data_versions)
+    
     def refresh_all_data(self):
         """Rafraîchit toutes les données"""
         if not self.connected:
             self.logger.warning("Tentative de rafraîchissement des données sans connexion MT5")
             return False
         
+        with self._refresh_lock:
+            try:
+                # Requêtes l'une après l'autre sur le thread de rafraîchissement: le canal IPC
+                # de MetaTrader5 n'est pas thread-safe et le connecteur sérialise ses appels
+                self.refresh_account_info()
+                self.refresh_positions()
+                self.refresh_historical_deals()
+                self.refresh_historical_orders()
+                
+                # La courbe d'équité dépend des transactions et des informations du compte
+                self.calculate_equity_curve()
+                self.update_account_snapshot()
+                return True
+            except Exception as e:
+                self.logger.exception("Erreur lors du rafraîchissement des données")
+                return False
+    
+    def refresh_live_data(self):
+        """
+        Rafraîchit les informations du compte et les positions (préchargement en arrière-plan),
+        puis les données qui en dérivent si leur contenu a changé
+        La VaR mensuelle et l'historique des transactions restent du ressort du rafraîchissement complet
+        
+        Returns:
+            bool: True si le rafraîchissement a eu lieu, False si un autre était en cours
+        """
+        if not self.connected:
+            return False
+        
+        # Laisser la place à un rafraîchissement complet en cours plutôt que de l'attendre
+        if not self._refresh_lock.acquire(blocking=False):
+            return False
+        
         try:
+            before = self.get_data_versions()
             self.refresh_account_info()
             self.refresh_positions()
-            self.refresh_historical_deals()
-            self.refresh_historical_orders()
-            self.calculate_equity_curve()
+            after = self.get_data_versions()
+            
+            # Garder la courbe d'équité et l'instantané du compte cohérents avec les versions
+            if after["account_info"] != before["account_info"]:
+                self.calculate_equity_curve()
+            if after != before:
+                self.update_account_snapshot(include_var=False)
             return True
-        except Exception as e:
-            self.logger.exception("Erreur lors du rafraîchissement des données")
-            return False
+        finally:
+            self._refresh_lock.release()
+    
+    def update_account_snapshot(self, include_var=True):
+        """
+        Copie les champs affichés du compte et calcule les indicateurs dérivés dans un dict,
+        lu par les widgets sans réaccéder à la structure MT5 ni refaire les calculs
+        
+        Args:
+            include_var (bool): Recalculer la VaR mensuelle (un appel MT5 par position).
+                Si False, la valeur du précédent instantané est conservée.
+        
+        Returns:
+            dict: Instantané du compte, None si aucune information de compte
+        """
+        account_info = self.account_info
+        if account_info is None:
+            snapshot = None
+        else:
+            previous = self.account_snapshot
+            if include_var or previous is None:
+                monthly_var = self.calculate_monthly_var()
+            else:
+                monthly_var = previous["monthly_var"]
+            
+            snapshot = {
+                "login": account_info.login,
+                "server": account_info.server,
+                "currency": account_info.currency,
+                "balance": account_info.balance,
+                "equity": account_info.equity,
+                "profit": account_info.profit,
+                "margin": account_info.margin,
+                "margin_pct": self.get_current_margin_percentage(),
+                "margin_level": self.get_margin_level(),
+                "d_leverage": self.calculate_d_leverage(),
+                "monthly_var": monthly_var,
+            }
+        with self.lock:
+            self.account_snapshot = snapshot
+        return snapshot
     
     def refresh_account_info(self):
         """Rafraîchit les informations du compte"""
         if not self.connected:
             return None
         
-        self.account_info = self.mt5_connector.refresh_account_info()
-        return self.account_info
+        account_info = self.mt5_connector.refresh_account_info()
+        self._store("account_info", "account_info", account_info)
+        return account_info
     
     def refresh_positions(self):
         """Rafraîchit les positions ouvertes"""
         if not self.connected:
             return None
         
-        self.positions = self.mt5_connector.get_positions()
-        return self.positions
+        positions = self.mt5_connector.get_positions()
+        self._store("positions", "positions", positions)
+        return positions
+    
+    def get_positions(self, fields=None):
+        """
+        Récupère les positions ouvertes directement depuis MT5, sans mettre à jour le cache
+        
+        Args:
+            fields (tuple, optional): Champs à matérialiser. Si None, tous les champs.
+        
+        Returns:
+            pd.DataFrame: Positions ouvertes, ou None si non connecté
+        """
+        if not self.connected:
+            return None
+        
+        return self.mt5_connector.get_positions(fields)
     
     def refresh_historical_deals(self, days=90):
         """Rafraîchit l'historique des transactions"""
         if not self.connected:
             return None
         
-        self.historical_deals = self.mt5_connector.get_historical_deals(days)
-        return self.historical_deals
+        historical_deals = self.mt5_connector.get_historical_deals(days)
+        self._store("historical_deals", "historical_deals", historical_deals)
+        return historical_deals
+    
+    def get_historical_deals(self, days=90, symbol=None):
+        """
+        Récupère l'historique des transactions d'un symbole, sans mettre à jour le cache
+        
+        Args:
+            days (int): Nombre de jours d'historique
+            symbol (str, optional): Symbole à filtrer côté MT5. Si None, toutes les transactions.
+        
+        Returns:
+            pd.DataFrame: Historique des transactions, ou None si non connecté
+        """
+        if not self.connected:
+            return None
+        
+        return self.mt5_connector.get_historical_deals(days, symbol=symbol)
     
     def refresh_historical_orders(self, days=90):
         """Rafraîchit l'historique des ordres"""
         if not self.connected:
             return None
         
-        self.historical_orders = self.mt5_connector.get_historical_orders(days)
-        return self.historical_orders
+        historical_orders = self.mt5_connector.get_historical_orders(days)
+        with self.lock:
+            self.historical_orders = historical_orders
+        return historical_orders
     
     def calculate_equity_curve(self, days=90):
         """Calcule la courbe d'équité basée sur l'historique des transactions"""
@@ -114,27 +288,30 @@ class DataManager:
                 # Fallback si account_info n'est pas disponible
                 initial_balance = self.historical_deals['profit'].sum()
             
-            # Créer un DataFrame avec les deals
-            deals_df = self.historical_deals.copy()
-            deals_df['equity'] = initial_balance + deals_df['profit'].cumsum()
+            # Équité cumulée après chaque deal (les deals sont triés par date)
+            deal_times = self.historical_deals['time'].to_numpy()
+            deal_equity = initial_balance + self.historical_deals['profit'].cumsum().to_numpy()
             
             # Créer des données journalières
             dates = pd.date_range(start=from_date, end=now, freq='D')
-            equity_series = pd.Series(index=dates, dtype=float)
+            day_times = dates.to_numpy()
             
-            # Remplir avec la dernière valeur connue pour chaque jour
-            for date in dates:
-                mask = deals_df['time'] <= date
-                if mask.any():
-                    equity_series[date] = deals_df.loc[mask, 'equity'].iloc[-1]
-                else:
-                    equity_series[date] = initial_balance
+            # Remplir avec la dernière valeur connue pour chaque jour (parcours à deux pointeurs)
+            values = [initial_balance] * len(dates)
+            last_idx = 0
+            n_deals = len(deal_times)
+            for i, date in enumerate(day_times):
+                while last_idx < n_deals and deal_times[last_idx] <= date:
+                    last_idx += 1
+                if last_idx > 0:
+                    values[i] = deal_equity[last_idx - 1]
             
             # Stocker les données d'équité
-            self.equity_data = equity_series
+            self._store("equity_data", "equity", pd.Series(values, index=dates, dtype=float),
+                        same=self._same_daily_series)
             
             return self.equity_data
-            
+        
         except Exception as e:
             self.logger.exception("Erreur lors du calcul de la courbe d'équité")
             return None
@@ -165,19 +342,53 @@ class DataManager:
         except:
             return 0
     
-    def calculate_d_leverage(self):
-        """Calcule le D-Leverage approximatif"""
-        if not self.connected or not self.account_info or self.positions is None or self.positions.empty:
+    def calculate_d_leverage(self, positions=None):
+        """
+        Calcule le D-Leverage approximatif
+        
+        Args:
+            positions (pd.DataFrame): Positions à utiliser (par défaut les positions en cache)
+        """
+        if positions is None:
+            positions = self.positions
+        if not self.connected or not self.account_info or positions is None or positions.empty:
             return 0
         
         try:
-            total_volume = self.positions['volume'].sum()
+            # Réduction directe sur la colonne float64 contiguë (sans passer par la Series)
+            total_volume = float(np.add.reduce(positions['volume'].to_numpy(dtype=np.float64)))
             if self.account_info.equity > 0:
                 return (total_volume * 100000) / self.account_info.equity
             return 0
         except:
             return 0
     
+    def get_d_leverage_history(self, max_history=1000):
+        """
+        Retourne l'historique du D-Leverage après y avoir ajouté la valeur courante
+        si les informations du compte ou les positions ont changé depuis le dernier point
+        
+        Args:
+            max_history (int): Nombre maximal de points conservés
+        
+        Returns:
+            dict: Listes "timestamp", "value" et "avg_duration"
+        """
+        versions = self.get_data_versions()
+        versions = (versions["account_info"], versions["positions"])
+        if versions != self._d_leverage_history_versions:
+            self._d_leverage_history_versions = versions
+            history = self.d_leverage_history
+            history["timestamp"].append(pd.Timestamp.now())
+            history["value"].append(self.calculate_d_leverage())
+            history["avg_duration"].append(self.get_average_position_duration())
+            
+            # Limiter la taille de l'historique (sur place: les widgets gardent une référence aux listes)
+            if len(history["timestamp"]) > max_history:
+                for values in history.values():
+                    del values[:-max_history]
+        return self.d_leverage_history
+    
     def calculate_positions_volatility(self):
         """Calcule la volatilité du portefeuille basée sur les positions ouvertes"""
         if not self.connected or not self.account_info or self.positions is None or self.positions.empty:
@@ -241,22 +452,19 @@ class DataManager:
             return 0
     
     def get_average_position_duration(self):
-        """Calcule la durée moyenne des positions ouvertes"""
-        if not self.connected or self.positions is None or self.positions.empty:
+        """
+        Calcule la durée moyenne (en minutes) des positions ouvertes à partir de leur heure d'ouverture
+        
+        Returns:
+            float: Durée moyenne en minutes, 0 si aucune position
+        """
+        positions = self.positions
+        if not self.connected or positions is None or positions.empty or 'time' not in positions:
             return 0
         
         try:
-            now = datetime.now()
-            durations = []
-            
-            for _, position in self.positions.iterrows():
-                if 'time' in position:
-                    position_time = datetime.fromtimestamp(position['time'])
-                    duration_minutes = (now - position_time).total_seconds() / 60
-                    durations.append(duration_minutes)
-            
-            if durations:
-                return sum(durations) / len(durations)
+            open_times = positions['time'].to_numpy(dtype=np.int64)
+            return float(np.mean(time.time() - open_times)) / 60.0
+        except Exception as e:
+            self.logger.exception("Erreur lors du calcul de la durée moyenne des positions")
             return 0
-        except:
-            return 0
\ No newline at end of file
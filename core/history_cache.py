@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cache disque de l'historique MT5 pour MT5 Trading Analyzer
+Conserve les transactions par compte et par jour pour éviter de recharger
+depuis MT5 les journées déjà clôturées (les ordres, modifiables après leur
+jour de création, ne sont pas mis en cache)
+"""
+
+import logging
+import time
+from pathlib import Path
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401 - moteur parquet utilisé par pandas
+except ImportError:  # pyarrow est optionnel, le cache est alors désactivé
+    pyarrow = None
+
+class HistoryCache:
+    """Classe de cache de l'historique MT5 partitionné par jour"""
+    
+    def __init__(self, account_login, ttl=30):
+        """
+        Initialisation du cache d'historique
+        
+        Args:
+            account_login (int): Numéro du compte MT5 (clé de partitionnement)
+            ttl (float): Durée de validité en secondes du bucket du jour courant
+        """
+        self.logger = logging.getLogger(__name__)
+        self.cache_dir = Path.home() / ".mt5_analyzer" / "cache" / str(account_login)
+        self.ttl = ttl
+        
+        # Bucket du jour courant, gardé en mémoire: kind -> (horodatage, jour, DataFrame)
+        self._today = {}
+        
+        self.enabled = pyarrow is not None
+        if self.enabled:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        else:
+            self.logger.info("pyarrow non disponible, cache d'historique désactivé")
+    
+    def _day_path(self, kind, day):
+        """Chemin du fichier parquet pour un type d'historique et un jour"""
+        return self.cache_dir / f"{kind}_{day:%Y%m%d}.parquet"
+    
+    def load_day(self, kind, day):
+        """
+        Charge un jour clôturé depuis le disque
+        
+        Args:
+            kind (str): Type d'historique ("deals")
+            day (date): Jour à charger
+        
+        Returns:
+            pd.DataFrame: Données du jour, ou None si absentes du cache
+        """
+        path = self._day_path(kind, day)
+        if not path.exists():
+            return None
+        
+        try:
+            return pd.read_parquet(path)
+        except Exception as e:
+            self.logger.exception("Erreur lors de la lecture du cache %s", path)
+            return None
+    
+    def store_day(self, kind, day, df):
+        """
+        Enregistre un jour clôturé sur le disque
+        
+        Args:
+            kind (str): Type d'historique ("deals")
+            day (date): Jour à enregistrer
+            df (pd.DataFrame): Données du jour
+        """
+        path = self._day_path(kind, day)
+        try:
+            df.to_parquet(path, compression='zstd')
+        except Exception as e:
+            self.logger.exception("Erreur lors de l'écriture du cache %s", path)
+    
+    def get_today(self, kind, day):
+        """
+        Récupère le bucket du jour courant
+        
+        Args:
+            kind (str): Type d'historique ("deals")
+            day (date): Jour courant
+            
+        Returns:
+            tuple: (DataFrame ou None si absent, True si le bucket est encore valide)
+        """
+        entry = self._today.get(kind)
+        if entry is None:
+            return None, False
+        
+        timestamp, cached_day, df = entry
+        if cached_day != day:
+            return None, False
+        return df, time.monotonic() - timestamp < self.ttl
+    
+    def set_today(self, kind, day, df):
+        """
+        Met à jour le bucket du jour courant
+        
+        Args:
+            kind (str): Type d'historique ("deals")
+            day (date): Jour courant
+            df (pd.DataFrame): Données du jour
+        """
+        self._today[kind] = (time.monotonic(), day, df)
@@ -6,11 +6,163 @@ Module de connexion à MetaTrader 5
 Gère la connexion, l'initialisation et les requêtes MT5
 """
 
+import functools
 import logging
+import operator
+import threading
+import time
 import MetaTrader5 as mt5
-from datetime import datetime, timedelta
-import pytz
+from datetime import datetime, timedelta, timezone
+import numpy as np
 import pandas as pd
+from core.history_cache import HistoryCache
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow est optionnel
+    pa = None
+
+# Types NumPy des champs numériques renvoyés par MT5 (positions, transactions, ordres).
+# Les champs absents de cette table (symbol, comment, external_id) restent des objets.
+_FIELD_DTYPES = {
+    'ticket': 'i8', 'order': 'i8', 'identifier': 'i8', 'magic': 'i8',
+    'position_id': 'i8', 'position_by_id': 'i8',
+    'time': 'i8', 'time_msc': 'i8', 'time_update': 'i8', 'time_update_msc': 'i8',
+    'time_setup': 'i8', 'time_setup_msc': 'i8', 'time_done': 'i8', 'time_done_msc': 'i8',
+    'time_expiration': 'i8',
+    'type': 'i4', 'entry': 'i4', 'reason': 'i4', 'state': 'i4',
+    'type_time': 'i4', 'type_filling': 'i4',
+    'volume': 'f8', 'volume_initial': 'f8', 'volume_current': 'f8',
+    'price': 'f8', 'price_open': 'f8', 'price_current': 'f8', 'price_stoplimit': 'f8',
+    'sl': 'f8', 'tp': 'f8', 'commission': 'f8', 'swap': 'f8', 'profit': 'f8', 'fee': 'f8',
+}
+
+# Colonne d'horodatage de référence pour chaque type d'historique
+_TIME_COLUMNS = {"deals": "time", "orders": "time_setup"}
+
+# Types d'historique mis en cache par jour: seules les transactions sont immuables une fois
+# exécutées; un ordre peut encore être exécuté ou annulé après son jour de création
+_CACHED_KINDS = ("deals",)
+
+# Colonnes texte très répétitives de l'historique, stockées en catégories
+_CATEGORY_COLUMNS = ('symbol', 'comment', 'external_id')
+
+@functools.lru_cache(maxsize=None)
+def _records_dtype(fields):
+    """
+    Construit (une seule fois par schéma) le dtype structuré d'un type d'enregistrement MT5
+    
+    Args:
+        fields (tuple): Noms des champs du namedtuple MT5
+        
+    Returns:
+        np.dtype: Dtype structuré avec les types figés de _FIELD_DTYPES
+    """
+    return np.dtype([(name, _FIELD_DTYPES.get(name, 'O')) for name in fields])
+
+def _records_to_array(records):
+    """
+    Convertit une séquence de namedtuples MT5 en tableau structuré NumPy
+    
+    Args:
+        records: Séquence non vide de namedtuples retournée par l'API MT5
+        
+    Returns:
+        np.ndarray: Tableau structuré dont les champs suivent l'ordre des namedtuples
+    """
+    return np.array(records, dtype=_records_dtype(records[0]._fields))
+
+def _records_to_projection(records, fields):
+    """
+    Extrait uniquement certains champs d'une séquence de namedtuples MT5
+    
+    Args:
+        records: Séquence non vide de namedtuples retournée par l'API MT5
+        fields (tuple): Noms des champs à extraire
+        
+    Returns:
+        dict: Nom du champ -> tableau NumPy de la colonne
+    """
+    names = records[0]._fields
+    columns = {}
+    for field in fields:
+        getter = operator.itemgetter(names.index(field))
+        dtype = _FIELD_DTYPES.get(field)
+        if dtype is None:
+            columns[field] = np.array([getter(record) for record in records], dtype=object)
+        else:
+            columns[field] = np.fromiter(map(getter, records), dtype=dtype, count=len(records))
+    return columns
+
+def _sort_by_time(arr, field):
+    """
+    Trie un tableau structuré par horodatage, uniquement s'il n'est pas déjà ordonné
+    
+    Args:
+        arr (np.ndarray): Tableau structuré
+        field (str): Champ d'horodatage (secondes Unix)
+        
+    Returns:
+        np.ndarray: Tableau trié chronologiquement
+    """
+    times = arr[field]
+    if (times[:-1] <= times[1:]).all():
+        return arr
+    return arr[np.argsort(times, kind='stable')]
+
+def _categorize_strings(df):
+    """
+    Convertit les colonnes texte répétitives d'un historique en catégories
+    
+    Args:
+        df (pd.DataFrame): Historique MT5 (transactions ou ordres)
+        
+    Returns:
+        pd.DataFrame: Historique avec symbol/comment/external_id catégoriels
+    """
+    categories = {col: 'category' for col in _CATEGORY_COLUMNS if col in df.columns and df[col].dtype == object}
+    return df.astype(categories) if categories else df
+
+def _history_to_dataframe(records, time_field):
+    """
+    Convertit une séquence d'enregistrements d'historique MT5 en DataFrame trié par date
+    
+    Args:
+        records: Séquence non vide de namedtuples retournée par l'API MT5
+        time_field (str): Champ d'horodatage (secondes Unix)
+        
+    Returns:
+        pd.DataFrame: Historique trié chronologiquement
+    """
+    arr = _sort_by_time(_records_to_array(records), time_field)
+    
+    # Construire le DataFrame colonne par colonne depuis le tableau structuré; les
+    # timestamps (secondes Unix) deviennent des datetime par simple changement de type
+    columns = {name: arr[name] for name in arr.dtype.names}
+    columns[time_field] = arr[time_field].astype('datetime64[s]').astype('datetime64[ns]')
+    return pd.DataFrame(columns, copy=False)
+
+def _deals_to_dataframe(deals):
+    """Convertit une séquence de transactions MT5 en DataFrame trié par date"""
+    return _history_to_dataframe(deals, 'time')
+
+def _orders_to_dataframe(orders):
+    """Convertit une séquence d'ordres MT5 en DataFrame trié par date"""
+    return _history_to_dataframe(orders, 'time_setup')
+
+def _serialized(method):
+    """
+    Exécute une méthode de MT5Connector sous le verrou de la connexion
+    
+    Le canal IPC du module MetaTrader5 n'est pas thread-safe, et les caches du connecteur
+    (résultats horodatés, bucket du jour de l'historique) sont partagés entre les threads
+    de rafraîchissement, de préchargement et des boîtes de dialogue.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._mt5_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 class MT5Connector:
     """Classe de gestion de la connexion à MetaTrader 5"""
@@ -20,8 +172,17 @@ class MT5Connector:
         self.logger = logging.getLogger(__name__)
         self.connected = False
         self.account_info = None
-        self.timezone = pytz.timezone("Etc/UTC")
+        self.timezone = timezone.utc
+        self.history_cache = None
+        
+        # Verrou sérialisant tous les appels MT5 et l'accès aux caches du connecteur
+        self._mt5_lock = threading.RLock()
+        
+        # Derniers résultats MT5 horodatés (horloge monotone) pour limiter les appels répétés
+        self._account_info_cache = (0.0, None)
+        self._positions_cache = (0.0, None)
     
+    @_serialized
     def connect(self):
         """Établit la connexion à MetaTrader 5"""
         try:
@@ -44,6 +205,8 @@ class MT5Connector:
                 return False, f"Échec d'obtention des informations du compte: {error}"
             
             self.connected = True
+            self._account_info_cache = (time.monotonic(), self.account_info)
+            self.history_cache = HistoryCache(self.account_info.login)
             self.logger.info(f"Connecté au compte MT5 {self.account_info.login} ({self.account_info.server})")
             return True, f"Connecté au compte {self.account_info.login} ({self.account_info.server})"
             
@@ -51,103 +214,277 @@ class MT5Connector:
             self.logger.exception("Erreur lors de la connexion à MT5")
             return False, f"Erreur de connexion: {str(e)}"
     
+    @_serialized
     def disconnect(self):
         """Ferme la connexion à MetaTrader 5"""
         if self.connected:
             mt5.shutdown()
             self.connected = False
             self.account_info = None
+            self.history_cache = None
+            self._account_info_cache = (0.0, None)
+            self._positions_cache = (0.0, None)
             self.logger.info("Déconnecté de MT5")
     
-    def refresh_account_info(self):
-        """Rafraîchit les informations du compte"""
+    @_serialized
+    def refresh_account_info(self, ttl=0.5):
+        """
+        Rafraîchit les informations du compte
+        
+        Args:
+            ttl (float): Durée en secondes pendant laquelle le dernier résultat est réutilisé
+            
+        Returns:
+            Informations du compte MT5, ou None en cas d'erreur
+        """
         if not self.connected:
             return None
         
         try:
+            now = time.monotonic()
+            timestamp, info = self._account_info_cache
+            if info is not None and now - timestamp < ttl:
+                return info
+            
             self.account_info = mt5.account_info()
+            self._account_info_cache = (now, self.account_info)
             return self.account_info
         except Exception as e:
             self.logger.exception("Erreur lors du rafraîchissement des informations du compte")
             return None
     
-    def get_positions(self):
-        """Récupère les positions ouvertes"""
+    @_serialized
+    def get_positions(self, fields=None, ttl=0.25):
+        """
+        Récupère les positions ouvertes
+        
+        Args:
+            fields (tuple, optional): Champs à matérialiser. Si None, tous les champs.
+            ttl (float): Durée en secondes pendant laquelle le dernier résultat MT5 est réutilisé
+            
+        Returns:
+            pd.DataFrame: Positions ouvertes, ou None en cas d'erreur
+        """
         if not self.connected:
             return None
         
         try:
-            positions = mt5.positions_get()
+            now = time.monotonic()
+            timestamp, positions = self._positions_cache
+            if positions is None or now - timestamp >= ttl:
+                positions = mt5.positions_get()
+                self._positions_cache = (now, positions)
+            
             if positions:
                 # Convertir en DataFrame
-                return pd.DataFrame(list(positions), columns=positions[0]._asdict().keys())
+                if fields is not None:
+                    return pd.DataFrame(_records_to_projection(positions, fields), copy=False)
+                return pd.DataFrame(_records_to_array(positions), copy=False)
             return pd.DataFrame()
         except Exception as e:
             self.logger.exception("Erreur lors de la récupération des positions")
             return None
     
-    def get_historical_deals(self, days=90):
-        """Récupère l'historique des transactions sur une période donnée"""
+    @_serialized
+    def get_historical_deals(self, days=90, symbol=None, group=None):
+        """
+        Récupère l'historique des transactions sur une période donnée
+        
+        Args:
+            days (int): Nombre de jours d'historique
+            symbol (str, optional): Symbole à filtrer côté terminal MT5
+            group (str, optional): Filtre de groupe MT5 (ex: "*USD*"), prioritaire sur symbol
+            
+        Returns:
+            pd.DataFrame: Historique des transactions, ou None en cas d'erreur
+        """
         if not self.connected:
             return None
         
         try:
-            # Définir la période
-            now = datetime.now()
-            from_date = now - timedelta(days=days)
+            # Définir la période (en UTC)
+            to_date = datetime.now(tz=self.timezone)
+            from_date = to_date - timedelta(days=days)
             
-            # Localiser les dates avec le fuseau horaire
-            from_date = self.timezone.localize(from_date)
-            to_date = self.timezone.localize(now)
+            if group is None and symbol is not None:
+                group = f"*{symbol}*"
+            
+            if group is not None:
+                # Filtrage effectué par le terminal: pas de passage par le cache (qui contient tout)
+                deals = mt5.history_deals_get(from_date, to_date, group=group)
+                if deals is None:
+                    raise RuntimeError(f"Échec de récupération de l'historique (deals, {group}): {mt5.last_error()}")
+                return _categorize_strings(_deals_to_dataframe(deals)) if deals else pd.DataFrame()
             
             # Récupérer l'historique
-            deals = mt5.history_deals_get(from_date, to_date)
-            if deals:
-                # Convertir en DataFrame
-                deals_df = pd.DataFrame(list(deals), columns=deals[0]._asdict().keys())
-                
-                # Convertir les timestamps en datetime
-                deals_df['time'] = pd.to_datetime(deals_df['time'], unit='s')
-                deals_df.sort_values('time', inplace=True)
-                
-                return deals_df
-                
-            return pd.DataFrame()
+            deals_df = self._get_history("deals", mt5.history_deals_get, _deals_to_dataframe, from_date, to_date)
+            # Les jours sont assemblés dans l'ordre et déjà triés: ne retrier qu'en dernier recours
+            if not deals_df.empty and not deals_df['time'].is_monotonic_increasing:
+                deals_df = deals_df.sort_values('time', kind='stable')
+            
+            return deals_df
         except Exception as e:
             self.logger.exception("Erreur lors de la récupération de l'historique des transactions")
             return None
     
+    @_serialized
     def get_historical_orders(self, days=90):
         """Récupère l'historique des ordres sur une période donnée"""
         if not self.connected:
             return None
         
         try:
-            # Définir la période
-            now = datetime.now()
-            from_date = now - timedelta(days=days)
-            
-            # Localiser les dates avec le fuseau horaire
-            from_date = self.timezone.localize(from_date)
-            to_date = self.timezone.localize(now)
+            # Définir la période (en UTC)
+            to_date = datetime.now(tz=self.timezone)
+            from_date = to_date - timedelta(days=days)
             
             # Récupérer l'historique
-            orders = mt5.history_orders_get(from_date, to_date)
-            if orders:
-                # Convertir en DataFrame
-                orders_df = pd.DataFrame(list(orders), columns=orders[0]._asdict().keys())
-                
-                # Convertir les timestamps en datetime
-                orders_df['time_setup'] = pd.to_datetime(orders_df['time_setup'], unit='s')
-                orders_df.sort_values('time_setup', inplace=True)
-                
-                return orders_df
-                
-            return pd.DataFrame()
+            orders_df = self._get_history("orders", mt5.history_orders_get, _orders_to_dataframe, from_date, to_date)
+            # Les jours sont assemblés dans l'ordre et déjà triés: ne retrier qu'en dernier recours
+            if not orders_df.empty and not orders_df['time_setup'].is_monotonic_increasing:
+                orders_df = orders_df.sort_values('time_setup', kind='stable')
+            
+            return orders_df
         except Exception as e:
             self.logger.exception("Erreur lors de la récupération de l'historique des ordres")
             return None
     
+    def _get_history(self, kind, fetch, to_dataframe, from_date, to_date):
+        """
+        Récupère un historique MT5, en passant par le cache disque s'il est disponible
+        
+        Args:
+            kind (str): Type d'historique ("deals" ou "orders")
+            fetch (callable): Fonction MT5 de récupération (history_deals_get, history_orders_get)
+            to_dataframe (callable): Fonction de conversion des enregistrements en DataFrame
+            from_date (datetime): Début de la période (localisé)
+            to_date (datetime): Fin de la période (localisée)
+            
+        Returns:
+            pd.DataFrame: Historique sur la période
+        """
+        # Catégoriser après assemblage: la concaténation de catégories différentes
+        # d'un jour à l'autre retomberait sur des objets
+        return _categorize_strings(self._assemble_history(kind, fetch, to_dataframe, from_date, to_date))
+    
+    def _assemble_history(self, kind, fetch, to_dataframe, from_date, to_date):
+        """Assemble l'historique depuis MT5 et le cache disque (voir _get_history)"""
+        if self.history_cache is None or not self.history_cache.enabled or kind not in _CACHED_KINDS:
+            records = fetch(from_date, to_date)
+            return to_dataframe(records) if records else pd.DataFrame()
+        
+        # Assembler la période jour par jour: les jours clôturés sont immuables et
+        # servis depuis le disque, seul le jour courant est rechargé depuis MT5.
+        # Chaque suite contiguë de jours absents du cache est demandée en un seul appel.
+        today = to_date.date()
+        day = from_date.date()
+        frames = []
+        missing_start = None
+        while day <= today:
+            df = self.history_cache.load_day(kind, day) if day < today else None
+            if day < today and df is None:
+                if missing_start is None:
+                    missing_start = day
+                day += timedelta(days=1)
+                continue
+            
+            if missing_start is not None:
+                frames.extend(self._fetch_missing_days(kind, fetch, to_dataframe, missing_start, day))
+                missing_start = None
+            if day == today:
+                df = self._get_today_history(kind, fetch, to_dataframe, day)
+            
+            if not df.empty:
+                frames.append(df)
+            day += timedelta(days=1)
+        
+        if not frames:
+            return pd.DataFrame()
+        
+        # Retirer les doublons aux bornes des jours et restreindre à la période demandée
+        history_df = pd.concat(frames, ignore_index=True).drop_duplicates('ticket')
+        return history_df[history_df[_TIME_COLUMNS[kind]] >= from_date.replace(tzinfo=None)]
+    
+    def _fetch_missing_days(self, kind, fetch, to_dataframe, first_day, end_day):
+        """
+        Récupère en un seul appel MT5 une suite de jours clôturés absents du cache
+        
+        Le résultat est découpé par jour et chaque jour est enregistré dans le cache disque.
+        
+        Args:
+            kind (str): Type d'historique ("deals" ou "orders")
+            fetch (callable): Fonction MT5 de récupération
+            to_dataframe (callable): Fonction de conversion des enregistrements en DataFrame
+            first_day (date): Premier jour manquant
+            end_day (date): Jour suivant le dernier jour manquant
+            
+        Returns:
+            list: DataFrames non vides des jours récupérés
+        """
+        n_days = (end_day - first_day).days
+        bounds = [datetime.combine(first_day + timedelta(days=i), datetime.min.time()) for i in range(n_days + 1)]
+        run_df = self._fetch_history_range(kind, fetch, to_dataframe,
+                                           bounds[0].replace(tzinfo=self.timezone),
+                                           bounds[-1].replace(tzinfo=self.timezone))
+        
+        # L'historique est trié par date: les bornes de jours se trouvent par recherche dichotomique
+        if run_df.empty:
+            offsets = [0] * len(bounds)
+        else:
+            offsets = run_df[_TIME_COLUMNS[kind]].searchsorted(np.array(bounds, dtype='datetime64[ns]'))
+        
+        frames = []
+        for i in range(n_days):
+            df = run_df.iloc[offsets[i]:offsets[i + 1]].reset_index(drop=True)
+            self.history_cache.store_day(kind, first_day + timedelta(days=i), df)
+            if not df.empty:
+                frames.append(df)
+        return frames
+    
+    def _get_today_history(self, kind, fetch, to_dataframe, day):
+        """
+        Récupère l'historique du jour courant de façon incrémentale
+        
+        Seule la fin de journée postérieure au dernier horodatage déjà connu est
+        demandée à MT5, puis ajoutée au bucket en mémoire.
+        
+        Args:
+            kind (str): Type d'historique ("deals" ou "orders")
+            fetch (callable): Fonction MT5 de récupération
+            to_dataframe (callable): Fonction de conversion des enregistrements en DataFrame
+            day (date): Jour courant
+            
+        Returns:
+            pd.DataFrame: Historique du jour courant
+        """
+        cached_df, fresh = self.history_cache.get_today(kind, day)
+        if fresh:
+            return cached_df
+        
+        day_start = datetime.combine(day, datetime.min.time(), tzinfo=self.timezone)
+        day_end = day_start + timedelta(days=1)
+        
+        if cached_df is None or cached_df.empty:
+            df = self._fetch_history_range(kind, fetch, to_dataframe, day_start, day_end)
+        else:
+            watermark = cached_df[_TIME_COLUMNS[kind]].max().to_pydatetime().replace(tzinfo=self.timezone)
+            delta_df = self._fetch_history_range(kind, fetch, to_dataframe, watermark, day_end)
+            if delta_df.empty:
+                df = cached_df
+            else:
+                df = pd.concat([cached_df, delta_df], ignore_index=True).drop_duplicates('ticket', keep='last')
+        
+        self.history_cache.set_today(kind, day, df)
+        return df
+    
+    def _fetch_history_range(self, kind, fetch, to_dataframe, from_date, to_date):
+        """Récupère un intervalle d'historique depuis MT5 et le convertit en DataFrame"""
+        records = fetch(from_date, to_date)
+        if records is None:
+            raise RuntimeError(f"Échec de récupération de l'historique ({kind}): {mt5.last_error()}")
+        return to_dataframe(records) if records else pd.DataFrame()
+    
+    @_serialized
     def get_symbol_info(self, symbol):
         """Récupère les informations d'un symbole"""
         if not self.connected:
@@ -159,19 +496,34 @@ class MT5Connector:
             self.logger.exception(f"Erreur lors de la récupération des informations du symbole {symbol}")
             return None
     
-    def get_historical_data(self, symbol, timeframe=mt5.TIMEFRAME_D1, count=100):
-        """Récupère les données historiques d'un symbole"""
+    @_serialized
+    def get_historical_data(self, symbol, timeframe=mt5.TIMEFRAME_D1, count=100, as_arrow=False):
+        """
+        Récupère les données historiques d'un symbole
+        
+        Args:
+            symbol (str): Symbole
+            timeframe: Période MT5 des barres
+            count (int): Nombre de barres à récupérer
+            as_arrow (bool): Retourner une table pyarrow plutôt qu'un DataFrame (si pyarrow est installé)
+            
+        Returns:
+            pd.DataFrame ou pa.Table: Barres historiques, ou None en cas d'erreur
+        """
         if not self.connected:
             return None
         
         try:
-            # Récupérer les données historiques
+            # Récupérer les données historiques (tableau structuré NumPy)
             rates = mt5.copy_rates_from_pos(symbol, timeframe, 0, count)
             if rates is not None:
-                # Convertir en DataFrame
-                df = pd.DataFrame(rates)
+                if as_arrow and pa is not None:
+                    return pa.Table.from_pydict({name: pa.array(rates[name]) for name in rates.dtype.names})
+                
+                # Envelopper chaque champ sans copie
+                df = pd.DataFrame({name: rates[name] for name in rates.dtype.names}, copy=False)
                 # Convertir le temps en datetime
-                df['time'] = pd.to_datetime(df['time'], unit='s')
+                df['time'] = rates['time'].astype('datetime64[s]').astype('datetime64[ns]')
                 return df
             return None
         except Exception as e:
@@ -7,6 +7,7 @@ Point d'entrée principal de l'application
 """
 
 import sys
+import threading
 import tkinter as tk
 import logging
 from pathlib import Path
@@ -29,6 +30,40 @@ def setup_logging():
         ]
     )
 
+# Préchargement des données MT5: nombre de préchargements par intervalle de rafraîchissement
+# configuré, et intervalle minimal entre deux préchargements (secondes)
+PREFETCH_PER_REFRESH = 4
+PREFETCH_MIN_INTERVAL = 1.0
+
+def _prefetch_loop(data_manager, config_manager, stop_event):
+    """
+    Garde les positions et les informations du compte à jour en mémoire entre deux
+    rafraîchissements complets, pour que les boîtes de dialogue n'interrogent pas MT5
+    à l'ouverture. Suspendu quand le rafraîchissement automatique est désactivé.
+    
+    Args:
+        data_manager (DataManager): Instance du gestionnaire de données
+        config_manager (ConfigManager): Instance du gestionnaire de configuration
+        stop_event (threading.Event): Événement signalant l'arrêt de l'application
+    """
+    logger = logging.getLogger(__name__)
+    
+    while True:
+        # Période relue à chaque tour pour suivre les changements de paramètres
+        refresh_interval = config_manager.get("data_refresh", "refresh_interval", 60)
+        period = max(PREFETCH_MIN_INTERVAL, refresh_interval / PREFETCH_PER_REFRESH)
+        if stop_event.wait(period):
+            return
+        
+        if not config_manager.get("data_refresh", "auto_refresh", True) or not data_manager.connected:
+            continue
+        
+        try:
+            # Ignoré si un rafraîchissement complet est déjà en cours
+            data_manager.refresh_live_data()
+        except Exception as e:
+            logger.exception("Erreur lors du préchargement des données MT5")
+
 def main():
     """Fonction principale de démarrage de l'application"""
     # Configuration du logging
@@ -40,10 +75,18 @@ def main():
     root = tk.Tk()
     app = MainWindow(root)
     
+    # Préchargement continu des données MT5 en arrière-plan, arrêté à la fermeture
+    stop_prefetch = threading.Event()
+    prefetch_thread = threading.Thread(target=_prefetch_loop, args=(app.data_manager, app.config_manager, stop_prefetch), daemon=True)
+    prefetch_thread.start()
+    
     # Lancement de la boucle principale
     logger.info("Application prête, démarrage de la boucle principale")
     root.mainloop()
     
+    stop_prefetch.set()
+    prefetch_thread.join(timeout=5)
+    
     logger.info("Fermeture de l'application")
 
 if __name__ == "__main__":
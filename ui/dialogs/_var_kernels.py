@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Noyau Numba de calcul de VaR historique glissante pour la boîte de dialogue VaR
+Numba est optionnel: si absent, le noyau vaut None et l'appelant
+utilise ses calculs NumPy
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba est optionnel
+    njit = None
+
+if njit is not None:
+    @njit(cache=True, parallel=True)
+    def rolling_order_stat(arr, window, k):
+        """
+        k-ième plus petite valeur (base 0) de chaque fenêtre glissante
+        
+        Args:
+            arr (np.ndarray): Rendements (float64)
+            window (int): Taille de la fenêtre
+            k (int): Rang de la statistique d'ordre (0 <= k < window)
+        
+        Returns:
+            np.ndarray: Statistique d'ordre de chaque fenêtre complète
+        """
+        n_out = arr.shape[0] - window + 1
+        out = np.empty(n_out)
+        for i in prange(n_out):
+            # Sélection partielle: seule la k-ième valeur est mise à sa place
+            out[i] = np.partition(arr[i:i + window].copy(), k)[k]
+        return out
+else:
+    rolling_order_stat = None
@@ -8,9 +8,19 @@ Boîte de dialogue d'optimisation D-Leverage pour MT5 Trading Analyzer
 import tkinter as tk
 from tkinter import ttk
 import logging
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from utils.constants import TRADING_CATEGORIES
 
+# Bornes de durée moyenne (minutes) séparant Scalping | Intraday | Swing
+_DURATION_EDGES = np.array([30.0, 60.0])
+_CATEGORY_NAMES = ("Scalping", "Intraday", "Swing")
+_CATEGORY_LABELS = ("Scalping (<30min)", "Intraday (30-60min)", "Swing (>60min)")
+
+# Exécuteur partagé pour les calculs MT5/pandas hors du thread Tk
+_EXECUTOR = ThreadPoolExecutor(max_workers=2)
+
 class DLeverageDialog:
     """Boîte de dialogue d'optimisation du D-Leverage"""
     
@@ -67,8 +77,11 @@ class DLeverageDialog:
         positions_frame = ttk.LabelFrame(self.dialog, text="Positions actuelles")
         positions_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        # Calculer les métriques actuelles
-        self.calculate_current_metrics(positions_frame)
+        # Calculer les métriques actuelles en arrière-plan
+        self.positions_frame = positions_frame
+        self.loading_label = ttk.Label(positions_frame, text="Chargement…")
+        self.loading_label.pack(anchor=tk.W, padx=10, pady=10)
+        _EXECUTOR.submit(self._load_metrics)
         
         # Frame pour les boutons
         button_frame = ttk.Frame(self.dialog)
@@ -82,45 +95,104 @@ class DLeverageDialog:
         apply_button = ttk.Button(button_frame, text="Appliquer les recommandations", state="disabled")
         apply_button.pack(side=tk.RIGHT, padx=10)
     
-    def calculate_current_metrics(self, parent_frame):
+    def _load_metrics(self):
+        """Calcule les métriques hors du thread Tk puis transmet le résultat à l'interface"""
+        try:
+            metrics = self.calculate_current_metrics()
+        except Exception as e:
+            self.logger.exception("Erreur lors du calcul des métriques de D-Leverage")
+            metrics = e
+        
+        try:
+            self.dialog.after(0, lambda: self._render_metrics(metrics))
+        except (tk.TclError, RuntimeError):
+            # La boîte de dialogue (ou l'application) a été fermée entre-temps
+            pass
+    
+    def calculate_current_metrics(self):
+        """
+        Calcule les métriques actuelles de D-Leverage
+        
+        Returns:
+            dict: Métriques calculées, ou None si aucune position n'est ouverte
         """
-        Calcule et affiche les métriques actuelles de D-Leverage
+        # Vérifier si des positions sont ouvertes
+        positions = self.data_manager.positions
+        if positions is None or positions.empty:
+            return None
+        
+        # Un seul instantané des positions en cache, réduit aux deux colonnes utiles,
+        # sert au D-Leverage comme aux suggestions
+        positions = positions[["symbol", "volume"]]
+        
+        # Calculer le D-Leverage actuel
+        d_leverage = self.data_manager.calculate_d_leverage(positions)
+        
+        # Déterminer la durée moyenne des positions
+        avg_duration = self.data_manager.get_average_position_duration()
+        
+        # Déterminer la catégorie et le D-Leverage cible
+        category_idx = int(np.searchsorted(_DURATION_EDGES, avg_duration, side='right'))
+        target_d_leverage = TRADING_CATEGORIES[_CATEGORY_NAMES[category_idx]]["optimal_max"]
+        
+        metrics = {
+            "d_leverage": d_leverage,
+            "avg_duration": avg_duration,
+            "category": _CATEGORY_LABELS[category_idx],
+            "target_d_leverage": target_d_leverage,
+            "reduction_needed": None,
+            "suggestions": []
+        }
+        
+        # Proposer des ajustements si nécessaire
+        if d_leverage > target_d_leverage:
+            reduction_needed = (d_leverage - target_d_leverage) / d_leverage
+            
+            # Calculer les volumes recommandés pour toutes les positions en une fois
+            symbols = positions["symbol"].to_numpy()
+            current_volumes = positions["volume"].to_numpy(dtype=np.float64)
+            new_volumes = current_volumes * (1.0 - reduction_needed)
+            vol_reductions = current_volumes - new_volumes
+            
+            metrics["reduction_needed"] = reduction_needed
+            metrics["suggestions"] = list(zip(symbols, current_volumes, new_volumes, vol_reductions))
+        
+        return metrics
+    
+    def _render_metrics(self, metrics):
+        """
+        Affiche les métriques actuelles de D-Leverage
         
         Args:
-            parent_frame: Frame parent pour l'affichage
+            metrics: Résultat de calculate_current_metrics, ou l'exception levée pendant le calcul
         """
+        if not self.dialog.winfo_exists():
+            return
+        
+        parent_frame = self.positions_frame
+        self.loading_label.destroy()
+        
+        if isinstance(metrics, Exception):
+            ttk.Label(parent_frame, text=f"Erreur lors du calcul: {str(metrics)}").pack(anchor=tk.W, padx=10, pady=10)
+            return
+        
         try:
-            # Vérifier si des positions sont ouvertes
-            if self.data_manager.positions is None or self.data_manager.positions.empty:
+            if metrics is None:
                 ttk.Label(parent_frame, text="Aucune position ouverte").pack(anchor=tk.W, padx=10, pady=10)
                 return
             
-            # Calculer le D-Leverage actuel
-            d_leverage = self.data_manager.calculate_d_leverage()
-            
-            # Déterminer la durée moyenne des positions
-            avg_duration = self.data_manager.get_average_position_duration()
-            
-            # Déterminer la catégorie et le D-Leverage cible
-            if avg_duration < 30:  # Scalping
-                target_d_leverage = TRADING_CATEGORIES["Scalping"]["max_d_leverage"]
-                category = "Scalping (<30min)"
-            elif avg_duration < 60:  # Intraday
-                target_d_leverage = TRADING_CATEGORIES["Intraday"]["max_d_leverage"]
-                category = "Intraday (30-60min)"
-            else:  # Swing
-                target_d_leverage = TRADING_CATEGORIES["Swing"]["max_d_leverage"]
-                category = "Swing (>60min)"
+            d_leverage = metrics["d_leverage"]
+            target_d_leverage = metrics["target_d_leverage"]
             
             # Afficher les informations
             ttk.Label(parent_frame, text=f"D-Leverage actuel: {d_leverage:.2f}").pack(anchor=tk.W, padx=10, pady=2)
-            ttk.Label(parent_frame, text=f"Durée moyenne des positions: {avg_duration:.1f} minutes").pack(anchor=tk.W, padx=10, pady=2)
-            ttk.Label(parent_frame, text=f"Catégorie détectée: {category}").pack(anchor=tk.W, padx=10, pady=2)
+            ttk.Label(parent_frame, text=f"Durée moyenne des positions: {metrics['avg_duration']:.1f} minutes").pack(anchor=tk.W, padx=10, pady=2)
+            ttk.Label(parent_frame, text=f"Catégorie détectée: {metrics['category']}").pack(anchor=tk.W, padx=10, pady=2)
             ttk.Label(parent_frame, text=f"D-Leverage cible recommandé: {target_d_leverage}").pack(anchor=tk.W, padx=10, pady=2)
             
             # Proposer des ajustements si nécessaire
-            if d_leverage > target_d_leverage:
-                reduction_needed = (d_leverage - target_d_leverage) / d_leverage
+            if metrics["reduction_needed"] is not None:
+                reduction_needed = metrics["reduction_needed"]
                 ttk.Label(parent_frame, 
                           text=f"Réduction recommandée: {reduction_needed*100:.1f}% du volume total", 
                           foreground="red").pack(anchor=tk.W, padx=10, pady=5)
@@ -149,24 +221,19 @@ class DLeverageDialog:
                 
                 suggestions_tree.pack(fill=tk.BOTH, expand=True)
                 
-                # Ajouter les suggestions pour chaque position
-                for _, position in self.data_manager.positions.iterrows():
-                    symbol = position["symbol"]
-                    current_volume = position["volume"]
-                    new_volume = current_volume * (1 - reduction_needed)
-                    vol_reduction = current_volume - new_volume
-                    
-                    suggestions_tree.insert("", tk.END, values=(
-                        symbol,
-                        f"{current_volume:.2f} lots",
-                        f"{new_volume:.2f} lots",
-                        f"-{vol_reduction:.2f} lots"
-                    ))
+                # Formater toutes les lignes d'abord, puis les insérer sans recherche d'attribut par ligne
+                rows = [
+                    (str(symbol), f"{current_volume:.2f} lots", f"{new_volume:.2f} lots", f"-{vol_reduction:.2f} lots")
+                    for symbol, current_volume, new_volume, vol_reduction in metrics["suggestions"]
+                ]
+                insert = suggestions_tree.insert
+                for row in rows:
+                    insert("", tk.END, values=row)
             else:
                 ttk.Label(parent_frame, 
                           text="Le D-Leverage actuel est dans les limites recommandées.", 
                           foreground="green").pack(anchor=tk.W, padx=10, pady=5)
                 
         except Exception as e:
-            self.logger.exception("Erreur lors du calcul des métriques de D-Leverage")
+            self.logger.exception("Erreur lors de l'affichage des métriques de D-Leverage")
             ttk.Label(parent_frame, text=f"Erreur lors du calcul: {str(e)}").pack(anchor=tk.W, padx=10, pady=10)
\ No newline at end of file
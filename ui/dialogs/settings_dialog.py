@@ -7,12 +7,74 @@ Boîte de dialogue des paramètres pour MT5 Trading Analyzer
 
 import tkinter as tk
 from tkinter import ttk
+from tkinter import messagebox
 import logging
-from utils.constants import REFRESH_INTERVALS
+import queue
+import re
+import smtplib
+import ssl
+import threading
+from utils.constants import REFRESH_INTERVALS, REFRESH_INTERVALS_INV
+
+# Port SMTP à TLS implicite (SMTPS)
+SMTP_SSL_PORT = 465
+
+# Seuils d'alerte: (clé, libellé, valeur par défaut, explication)
+_ALERT_ROWS = (
+    ("margin_pct", "Marge utilisée (%)", 50, "Alerte si la marge utilisée dépasse ce pourcentage"),
+    ("daily_loss", "Perte journalière (%)", 5, "Alerte si la perte quotidienne dépasse ce pourcentage"),
+    ("drawdown", "Drawdown (%)", 15, "Alerte si le drawdown dépasse ce pourcentage"),
+    ("d_leverage", "D-Leverage", 16.25, "Alerte si le D-Leverage dépasse cette valeur"),
+    ("var_monthly", "VaR mensuelle (%)", 12, "Alerte si la VaR mensuelle dépasse ce pourcentage"),
+    ("correlation", "Seuil de corrélation", 0.8, "Alerte si la corrélation entre instruments dépasse cette valeur"),
+    ("sector_concentration", "Concentration sectorielle (%)", 30, "Alerte si l'exposition à un secteur dépasse ce pourcentage"),
+)
+
+# Valeurs des seuils absents de la configuration
+_DEFAULT_THRESHOLDS = {name: default for name, _, default, _ in _ALERT_ROWS}
+
+# Seuils stockés en négatif dans la configuration mais saisis en valeur absolue
+_NEGATIVE_THRESHOLDS = ("daily_loss", "drawdown")
+
+# Valeurs proposées par les listes de choix
+_THEMES = ("default", "dark")
+_LANGS = ("fr", "en")
+_REFRESH_KEYS = tuple(REFRESH_INTERVALS)
+
+# Listes de choix de l'onglet Interface: (clé, libellé, valeurs)
+_UI_ROWS = (
+    ("theme", "Thème:", _THEMES),
+    ("chart_style", "Style de graphique:", _THEMES),
+    ("language", "Langue:", _LANGS),
+)
+
+# Champs de l'onglet Notifications: (clé, libellé, largeur ou None, type numérique, options du champ)
+_EMAIL_ROWS = (
+    ("smtp_server", "Serveur SMTP:", 30, None, {}),
+    ("smtp_port", "Port SMTP:", None, "int", {}),
+    ("smtp_username", "Nom d'utilisateur:", 30, None, {}),
+    ("smtp_password", "Mot de passe:", 30, None, {"show": "*"}),
+    ("recipient", "Destinataire:", 30, None, {}),
+)
+
+# Saisies partielles acceptées au clavier dans les champs numériques
+_FLOAT_RE = re.compile(r"^-?\d*\.?\d*$")
+_INT_RE = re.compile(r"^\d*$")
+
+def _is_float(text):
+    """Valide la saisie (en cours) d'un nombre décimal"""
+    return text == "" or _FLOAT_RE.match(text) is not None
+
+def _is_int(text):
+    """Valide la saisie (en cours) d'un entier positif"""
+    return _INT_RE.match(text) is not None
 
 class SettingsDialog:
     """Boîte de dialogue des paramètres de l'application"""
     
+    # Styles ttk partagés par toutes les instances, configurés à la première ouverture
+    _styles_initialized = False
+    
     def __init__(self, parent, config_manager):
         """
         Initialisation de la boîte de dialogue des paramètres
@@ -24,52 +86,95 @@ class SettingsDialog:
         self.logger = logging.getLogger(__name__)
         self.config_manager = config_manager
         self.result = False
+        self._done_callback = None
+        
+        if not SettingsDialog._styles_initialized:
+            style = ttk.Style()
+            style.configure("Settings.TLabel", padding=0)
+            SettingsDialog._styles_initialized = True
+        
+        # Instantané des paramètres au moment de l'ouverture, partagé par les onglets
+        self._cfg = {
+            'alert': config_manager.get_alert_thresholds(),
+            'refresh': config_manager.get_data_refresh_settings(),
+            'ui': config_manager.get_ui_settings(),
+            'email': config_manager.get_email_settings()
+        }
         
         # Création de la fenêtre de dialogue
-        self.dialog = tk.Toplevel(parent)
+        self.dialog = tk.Toplevel(parent, class_="SettingsDialog")
         self.dialog.title("Paramètres")
-        self.dialog.geometry("500x400")
+        
+        # Validateurs de saisie des champs numériques, enregistrés une fois pour la boîte de dialogue
+        self._validators = {
+            "float": (self.dialog.register(_is_float), "%P"),
+            "int": (self.dialog.register(_is_int), "%P")
+        }
         self.dialog.transient(parent)  # Dialogue modal
         self.dialog.grab_set()
+        self.dialog.protocol("WM_DELETE_WINDOW", self._close)
         
-        # Centrer la fenêtre
-        self.dialog.update_idletasks()
-        width = self.dialog.winfo_width()
-        height = self.dialog.winfo_height()
-        x = (self.dialog.winfo_screenwidth() // 2) - (width // 2)
-        y = (self.dialog.winfo_screenheight() // 2) - (height // 2)
+        # Centrer la fenêtre à partir de sa taille fixe, sans passe de mise en page
+        width, height = 500, 400
+        x = (self.dialog.winfo_screenwidth() - width) // 2
+        y = (self.dialog.winfo_screenheight() - height) // 2
         self.dialog.geometry(f"{width}x{height}+{x}+{y}")
         
         self.create_widgets()
+    
+    def show(self, callback):
+        """
+        Affiche la boîte de dialogue sans bloquer l'appelant
         
-        # Attendre la fermeture de la fenêtre
-        self.dialog.wait_window()
+        Args:
+            callback (callable): Appelée avec self.result à la fermeture de la boîte de dialogue
+        """
+        self._done_callback = callback
+    
+    def _close(self):
+        """Ferme la boîte de dialogue et notifie l'appelant"""
+        self.dialog.destroy()
+        if self._done_callback is not None:
+            self._done_callback(self.result)
     
     def create_widgets(self):
         """Création des widgets pour la boîte de dialogue"""
+        # Largeurs par défaut des champs de la boîte de dialogue, résolues par Tk à la création
+        self.dialog.option_add("*SettingsDialog*TEntry.width", 10)
+        self.dialog.option_add("*SettingsDialog*TCombobox.width", 15)
+        
         # Notebook pour les onglets de paramètres
         notebook = ttk.Notebook(self.dialog)
-        notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
         # Onglet 1: Seuils d'alerte
-        alert_tab = ttk.Frame(notebook)
-        notebook.add(alert_tab, text="Alertes")
-        self.create_alert_tab(alert_tab)
+        self.alert_tab = ttk.LabelFrame(notebook, text="Seuils d'alerte", padding=10)
+        notebook.add(self.alert_tab, text="Alertes")
         
         # Onglet 2: Rafraîchissement des données
-        refresh_tab = ttk.Frame(notebook)
-        notebook.add(refresh_tab, text="Rafraîchissement")
-        self.create_refresh_tab(refresh_tab)
+        self.refresh_tab = ttk.LabelFrame(notebook, text="Paramètres de rafraîchissement", padding=10)
+        notebook.add(self.refresh_tab, text="Rafraîchissement")
         
         # Onglet 3: Interface utilisateur
-        ui_tab = ttk.Frame(notebook)
-        notebook.add(ui_tab, text="Interface")
-        self.create_ui_tab(ui_tab)
+        self.ui_tab = ttk.LabelFrame(notebook, text="Paramètres d'interface", padding=10)
+        notebook.add(self.ui_tab, text="Interface")
         
         # Onglet 4: Notification par email
-        email_tab = ttk.Frame(notebook)
-        notebook.add(email_tab, text="Notifications")
-        self.create_email_tab(email_tab)
+        self.email_tab = ttk.LabelFrame(notebook, text="Notifications par email", padding=10)
+        notebook.add(self.email_tab, text="Notifications")
+        
+        # Les onglets sont construits à leur première sélection, seul le premier l'est tout de suite
+        self._tab_builders = {
+            str(self.alert_tab): (self.alert_tab, self.create_alert_tab),
+            str(self.refresh_tab): (self.refresh_tab, self.create_refresh_tab),
+            str(self.ui_tab): (self.ui_tab, self.create_ui_tab),
+            str(self.email_tab): (self.email_tab, self.create_email_tab)
+        }
+        self._built = set()
+        self._build_tab(str(self.alert_tab))
+        notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+        
+        # Placer le notebook une fois son contenu initial créé: une seule mise en page
+        notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
         # Frame pour les boutons
         button_frame = ttk.Frame(self.dialog)
@@ -80,276 +185,338 @@ class SettingsDialog:
         save_button.pack(side=tk.RIGHT, padx=5)
         
         # Bouton Annuler
-        cancel_button = ttk.Button(button_frame, text="Annuler", command=self.dialog.destroy)
+        cancel_button = ttk.Button(button_frame, text="Annuler", command=self._close)
         cancel_button.pack(side=tk.RIGHT, padx=5)
     
+    def _on_tab_changed(self, event):
+        """Construit l'onglet sélectionné s'il ne l'a pas encore été"""
+        self._build_tab(event.widget.select())
+    
+    def _build_tab(self, tab_id):
+        """
+        Construit un onglet une seule fois
+        
+        Args:
+            tab_id (str): Nom Tk du frame de l'onglet
+        """
+        if tab_id in self._built or tab_id not in self._tab_builders:
+            return
+        
+        tab, builder = self._tab_builders[tab_id]
+        builder(tab)
+        self._built.add(tab_id)
+    
     def create_alert_tab(self, parent):
         """
         Création de l'onglet des seuils d'alerte
         
         Args:
-            parent: Widget parent pour cet onglet
+            parent: Cadre de l'onglet (LabelFrame du notebook)
         """
-        # Frame pour les seuils d'alerte
-        alert_frame = ttk.LabelFrame(parent, text="Seuils d'alerte", padding=10)
-        alert_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        
         # Charger les seuils actuels
-        thresholds = self.config_manager.get_alert_thresholds()
-        
-        # Variables pour stocker les valeurs
-        self.alert_vars = {}
-        
-        # Marge utilisée
-        ttk.Label(alert_frame, text="Marge utilisée (%)").grid(row=0, column=0, sticky=tk.W, pady=5)
-        self.alert_vars['margin_pct'] = tk.DoubleVar(value=thresholds['margin_pct'])
-        margin_pct_entry = ttk.Entry(alert_frame, textvariable=self.alert_vars['margin_pct'], width=10)
-        margin_pct_entry.grid(row=0, column=1, padx=5)
-        
-        # Perte journalière
-        ttk.Label(alert_frame, text="Perte journalière (%)").grid(row=1, column=0, sticky=tk.W, pady=5)
-        self.alert_vars['daily_loss'] = tk.DoubleVar(value=abs(thresholds['daily_loss']))
-        daily_loss_entry = ttk.Entry(alert_frame, textvariable=self.alert_vars['daily_loss'], width=10)
-        daily_loss_entry.grid(row=1, column=1, padx=5)
-        
-        # Drawdown
-        ttk.Label(alert_frame, text="Drawdown (%)").grid(row=2, column=0, sticky=tk.W, pady=5)
-        self.alert_vars['drawdown'] = tk.DoubleVar(value=abs(thresholds['drawdown']))
-        drawdown_entry = ttk.Entry(alert_frame, textvariable=self.alert_vars['drawdown'], width=10)
-        drawdown_entry.grid(row=2, column=1, padx=5)
-        
-        # D-Leverage
-        ttk.Label(alert_frame, text="D-Leverage").grid(row=3, column=0, sticky=tk.W, pady=5)
-        self.alert_vars['d_leverage'] = tk.DoubleVar(value=thresholds['d_leverage'])
-        d_leverage_entry = ttk.Entry(alert_frame, textvariable=self.alert_vars['d_leverage'], width=10)
-        d_leverage_entry.grid(row=3, column=1, padx=5)
-        
-        # VaR mensuelle
-        ttk.Label(alert_frame, text="VaR mensuelle (%)").grid(row=4, column=0, sticky=tk.W, pady=5)
-        self.alert_vars['var_monthly'] = tk.DoubleVar(value=thresholds.get('var_monthly', 12))
-        var_monthly_entry = ttk.Entry(alert_frame, textvariable=self.alert_vars['var_monthly'], width=10)
-        var_monthly_entry.grid(row=4, column=1, padx=5)
-        
-        # Corrélation
-        ttk.Label(alert_frame, text="Seuil de corrélation").grid(row=5, column=0, sticky=tk.W, pady=5)
-        self.alert_vars['correlation'] = tk.DoubleVar(value=thresholds.get('correlation', 0.8))
-        correlation_entry = ttk.Entry(alert_frame, textvariable=self.alert_vars['correlation'], width=10)
-        correlation_entry.grid(row=5, column=1, padx=5)
-        
-        # Concentration sectorielle
-        ttk.Label(alert_frame, text="Concentration sectorielle (%)").grid(row=6, column=0, sticky=tk.W, pady=5)
-        self.alert_vars['sector_concentration'] = tk.DoubleVar(value=thresholds.get('sector_concentration', 30))
-        sector_concentration_entry = ttk.Entry(alert_frame, textvariable=self.alert_vars['sector_concentration'], width=10)
-        sector_concentration_entry.grid(row=6, column=1, padx=5)
-        
-        # Ajouter des explications pour chaque seuil
-        ttk.Label(alert_frame, text="Alerte si la marge utilisée dépasse ce pourcentage").grid(row=0, column=2, sticky=tk.W, padx=10)
-        ttk.Label(alert_frame, text="Alerte si la perte quotidienne dépasse ce pourcentage").grid(row=1, column=2, sticky=tk.W, padx=10)
-        ttk.Label(alert_frame, text="Alerte si le drawdown dépasse ce pourcentage").grid(row=2, column=2, sticky=tk.W, padx=10)
-        ttk.Label(alert_frame, text="Alerte si le D-Leverage dépasse cette valeur").grid(row=3, column=2, sticky=tk.W, padx=10)
-        ttk.Label(alert_frame, text="Alerte si la VaR mensuelle dépasse ce pourcentage").grid(row=4, column=2, sticky=tk.W, padx=10)
-        ttk.Label(alert_frame, text="Alerte si la corrélation entre instruments dépasse cette valeur").grid(row=5, column=2, sticky=tk.W, padx=10)
-        ttk.Label(alert_frame, text="Alerte si l'exposition à un secteur dépasse ce pourcentage").grid(row=6, column=2, sticky=tk.W, padx=10)
+        thresholds = {**_DEFAULT_THRESHOLDS, **self._cfg['alert']}
+        
+        # Champs de saisie, lus directement à l'enregistrement
+        self.alert_entries = {}
+        
+        # Une ligne par seuil: libellé, champ et explication
+        label_width = max(len(text) for _, text, _, _ in _ALERT_ROWS)
+        for name, text, _, help_text in _ALERT_ROWS:
+            value = thresholds[name]
+            if name in _NEGATIVE_THRESHOLDS:
+                value = abs(value)
+            self.alert_entries[name] = self._add_entry_line(parent, text, value, label_width,
+                                                            numeric="float", help_text=help_text)
     
     def create_refresh_tab(self, parent):
         """
         Création de l'onglet de rafraîchissement des données
         
         Args:
-            parent: Widget parent pour cet onglet
+            parent: Cadre de l'onglet (LabelFrame du notebook)
         """
-        # Frame pour les paramètres de rafraîchissement
-        refresh_frame = ttk.LabelFrame(parent, text="Paramètres de rafraîchissement", padding=10)
-        refresh_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self._configure_grid(parent, (1, 2), {1: 10})
         
         # Charger les paramètres actuels
-        refresh_settings = self.config_manager.get_data_refresh_settings()
+        refresh_settings = self._cfg['refresh']
         
         # Rafraîchissement automatique
         self.auto_refresh_var = tk.BooleanVar(value=refresh_settings['auto_refresh'])
-        auto_refresh_check = ttk.Checkbutton(refresh_frame, text="Rafraîchissement automatique",
-                                            variable=self.auto_refresh_var)
+        auto_refresh_check = ttk.Checkbutton(parent, text="Rafraîchissement automatique",
+                                             variable=self.auto_refresh_var)
         auto_refresh_check.grid(row=0, column=0, columnspan=2, sticky=tk.W, pady=10)
         
         # Intervalle de rafraîchissement
-        ttk.Label(refresh_frame, text="Intervalle de rafraîchissement:").grid(row=1, column=0, sticky=tk.W, pady=5)
-        
-        # Convertir l'intervalle en secondes en clé de dictionnaire
-        interval_seconds = refresh_settings['refresh_interval']
-        interval_key = None
-        for key, value in REFRESH_INTERVALS.items():
-            if value == interval_seconds:
-                interval_key = key
-                break
+        ttk.Label(parent, text="Intervalle de rafraîchissement:", style="Settings.TLabel").grid(row=1, column=0, sticky=tk.W)
         
-        # Si aucune correspondance trouvée, utiliser la valeur par défaut
-        if interval_key is None:
-            interval_key = "1m"  # 1 minute
+        # Convertir l'intervalle en secondes en clé de dictionnaire (1 minute par défaut)
+        interval_key = REFRESH_INTERVALS_INV.get(refresh_settings['refresh_interval'], "1m")
         
-        self.refresh_interval_var = tk.StringVar(value=interval_key)
-        refresh_interval_combo = ttk.Combobox(refresh_frame, textvariable=self.refresh_interval_var,
-                                             values=list(REFRESH_INTERVALS.keys()), width=10)
-        refresh_interval_combo.grid(row=1, column=1, sticky=tk.W, padx=5)
+        self.refresh_interval_combo = ttk.Combobox(parent, values=_REFRESH_KEYS, width=10)
+        self.refresh_interval_combo.set(interval_key)
+        self.refresh_interval_combo.grid(row=1, column=1, sticky=tk.W)
         
         # Jours d'historique
-        ttk.Label(refresh_frame, text="Jours d'historique à charger:").grid(row=2, column=0, sticky=tk.W, pady=5)
-        self.history_days_var = tk.IntVar(value=refresh_settings['history_days'])
-        history_days_entry = ttk.Entry(refresh_frame, textvariable=self.history_days_var, width=10)
-        history_days_entry.grid(row=2, column=1, sticky=tk.W, padx=5)
+        self.history_days_entry = self._add_entry_row(parent, 2, "Jours d'historique à charger:",
+                                                      refresh_settings['history_days'], numeric="int")
     
     def create_ui_tab(self, parent):
         """
         Création de l'onglet d'interface utilisateur
         
         Args:
-            parent: Widget parent pour cet onglet
+            parent: Cadre de l'onglet (LabelFrame du notebook)
         """
-        # Frame pour les paramètres d'interface
-        ui_frame = ttk.LabelFrame(parent, text="Paramètres d'interface", padding=10)
-        ui_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self._configure_grid(parent, range(len(_UI_ROWS)), {1: 10})
         
         # Charger les paramètres actuels
-        ui_settings = self.config_manager.get_ui_settings()
-        
-        # Thème
-        ttk.Label(ui_frame, text="Thème:").grid(row=0, column=0, sticky=tk.W, pady=5)
-        self.theme_var = tk.StringVar(value=ui_settings['theme'])
-        theme_combo = ttk.Combobox(ui_frame, textvariable=self.theme_var,
-                                  values=["default", "dark"], width=15)
-        theme_combo.grid(row=0, column=1, sticky=tk.W, padx=5)
-        
-        # Style de graphique
-        ttk.Label(ui_frame, text="Style de graphique:").grid(row=1, column=0, sticky=tk.W, pady=5)
-        self.chart_style_var = tk.StringVar(value=ui_settings['chart_style'])
-        chart_style_combo = ttk.Combobox(ui_frame, textvariable=self.chart_style_var,
-                                       values=["default", "dark"], width=15)
-        chart_style_combo.grid(row=1, column=1, sticky=tk.W, padx=5)
-        
-        # Langue
-        ttk.Label(ui_frame, text="Langue:").grid(row=2, column=0, sticky=tk.W, pady=5)
-        self.language_var = tk.StringVar(value=ui_settings['language'])
-        language_combo = ttk.Combobox(ui_frame, textvariable=self.language_var,
-                                     values=["fr", "en"], width=15)
-        language_combo.grid(row=2, column=1, sticky=tk.W, padx=5)
+        ui_settings = self._cfg['ui']
+        
+        # Listes de choix
+        self.ui_combos = {}
+        for row, (name, text, values) in enumerate(_UI_ROWS):
+            ttk.Label(parent, text=text, style="Settings.TLabel").grid(row=row, column=0, sticky=tk.W)
+            combo = ttk.Combobox(parent, values=values)
+            combo.set(ui_settings[name])
+            combo.grid(row=row, column=1, sticky=tk.W)
+            self.ui_combos[name] = combo
         
         # Afficher l'écran de bienvenue
         self.show_welcome_var = tk.BooleanVar(value=ui_settings['show_welcome'])
-        show_welcome_check = ttk.Checkbutton(ui_frame, text="Afficher l'écran de bienvenue au démarrage",
-                                           variable=self.show_welcome_var)
-        show_welcome_check.grid(row=3, column=0, columnspan=2, sticky=tk.W, pady=10)
+        show_welcome_check = ttk.Checkbutton(parent, text="Afficher l'écran de bienvenue au démarrage",
+                                             variable=self.show_welcome_var)
+        show_welcome_check.grid(row=len(_UI_ROWS), column=0, columnspan=2, sticky=tk.W, pady=10)
     
     def create_email_tab(self, parent):
         """
         Création de l'onglet de notification par email
         
         Args:
-            parent: Widget parent pour cet onglet
+            parent: Cadre de l'onglet (LabelFrame du notebook)
         """
-        # Frame pour les paramètres de notification par email
-        email_frame = ttk.LabelFrame(parent, text="Notifications par email", padding=10)
-        email_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        
         # Charger les paramètres actuels
-        email_settings = self.config_manager.get_email_settings()
+        email_settings = self._cfg['email']
         
         # Activer les notifications par email
         self.email_enabled_var = tk.BooleanVar(value=email_settings['enabled'])
-        email_enabled_check = ttk.Checkbutton(email_frame, text="Activer les notifications par email",
-                                             variable=self.email_enabled_var)
-        email_enabled_check.grid(row=0, column=0, columnspan=2, sticky=tk.W, pady=10)
-        
-        # Serveur SMTP
-        ttk.Label(email_frame, text="Serveur SMTP:").grid(row=1, column=0, sticky=tk.W, pady=5)
-        self.smtp_server_var = tk.StringVar(value=email_settings['smtp_server'])
-        smtp_server_entry = ttk.Entry(email_frame, textvariable=self.smtp_server_var, width=30)
-        smtp_server_entry.grid(row=1, column=1, sticky=tk.W, padx=5)
-        
-        # Port SMTP
-        ttk.Label(email_frame, text="Port SMTP:").grid(row=2, column=0, sticky=tk.W, pady=5)
-        self.smtp_port_var = tk.IntVar(value=email_settings['smtp_port'])
-        smtp_port_entry = ttk.Entry(email_frame, textvariable=self.smtp_port_var, width=10)
-        smtp_port_entry.grid(row=2, column=1, sticky=tk.W, padx=5)
-        
-        # Nom d'utilisateur SMTP
-        ttk.Label(email_frame, text="Nom d'utilisateur:").grid(row=3, column=0, sticky=tk.W, pady=5)
-        self.smtp_username_var = tk.StringVar(value=email_settings['smtp_username'])
-        smtp_username_entry = ttk.Entry(email_frame, textvariable=self.smtp_username_var, width=30)
-        smtp_username_entry.grid(row=3, column=1, sticky=tk.W, padx=5)
-        
-        # Mot de passe SMTP
-        ttk.Label(email_frame, text="Mot de passe:").grid(row=4, column=0, sticky=tk.W, pady=5)
-        self.smtp_password_var = tk.StringVar(value=email_settings['smtp_password'])
-        smtp_password_entry = ttk.Entry(email_frame, textvariable=self.smtp_password_var, width=30, show="*")
-        smtp_password_entry.grid(row=4, column=1, sticky=tk.W,padx=5)
-
-         # Destinataire
-        ttk.Label(email_frame, text="Destinataire:").grid(row=5, column=0, sticky=tk.W, pady=5)
-        self.recipient_var = tk.StringVar(value=email_settings['recipient'])
-        recipient_entry = ttk.Entry(email_frame, textvariable=self.recipient_var, width=30)
-        recipient_entry.grid(row=5, column=1, sticky=tk.W, padx=5)
+        email_enabled_check = ttk.Checkbutton(parent, text="Activer les notifications par email",
+                                              variable=self.email_enabled_var)
+        email_enabled_check.pack(anchor=tk.W, pady=10)
+        
+        # Paramètres du serveur SMTP et du destinataire
+        self.email_entries = {}
+        label_width = max(len(text) for _, text, _, _, _ in _EMAIL_ROWS)
+        for name, text, width, numeric, options in _EMAIL_ROWS:
+            self.email_entries[name] = self._add_entry_line(parent, text, email_settings[name], label_width,
+                                                            width, numeric, **options)
         
         # Bouton pour tester la configuration
-        test_button = ttk.Button(email_frame, text="Tester la configuration", command=self.test_email_config)
-        test_button.grid(row=6, column=0, columnspan=2, pady=10)
+        test_button = ttk.Button(parent, text="Tester la configuration", command=self.test_email_config)
+        test_button.pack(pady=10)
     
-    def test_email_config(self):
-        """Teste la configuration email en envoyant un email de test"""
-        # Cette méthode serait implémentée pour envoyer un email de test
-        # Basée sur les paramètres actuels de l'interface
-        # Pour l'instant, on affiche juste un message
-        from tkinter import messagebox
-        messagebox.showinfo("Test Email", "Fonctionnalité à implémenter dans une future version.")
+    def _configure_grid(self, frame, rows, column_pads):
+        """
+        Définit une fois pour toute la grille l'espacement des lignes et colonnes de saisie
+        
+        Args:
+            frame: Frame parent organisé en grille
+            rows: Indices des lignes libellé + champ (espacement vertical de 5 pixels de chaque côté)
+            column_pads (dict): Indice de colonne -> espacement horizontal total
+        """
+        for row in rows:
+            frame.grid_rowconfigure(row, pad=10)
+        for column, pad in column_pads.items():
+            frame.grid_columnconfigure(column, pad=pad)
     
-    def save_settings(self):
-        """Enregistre les paramètres"""
-        try:
-            # Enregistrer les seuils d'alerte
-            alert_thresholds = {
-                'margin_pct': self.alert_vars['margin_pct'].get(),
-                'daily_loss': -self.alert_vars['daily_loss'].get(),  # Valeur négative
-                'drawdown': -self.alert_vars['drawdown'].get(),      # Valeur négative
-                'd_leverage': self.alert_vars['d_leverage'].get(),
-                'var_monthly': self.alert_vars['var_monthly'].get(),
-                'correlation': self.alert_vars['correlation'].get(),
-                'sector_concentration': self.alert_vars['sector_concentration'].get()
-            }
-            self.config_manager.set_alert_thresholds(alert_thresholds)
-            
-            # Enregistrer les paramètres de rafraîchissement
-            refresh_settings = {
-                'auto_refresh': self.auto_refresh_var.get(),
-                'refresh_interval': REFRESH_INTERVALS[self.refresh_interval_var.get()],
-                'history_days': self.history_days_var.get()
-            }
-            self.config_manager.set_data_refresh_settings(refresh_settings)
+    def _add_entry_row(self, frame, row, text, value, width=None, numeric=None, **options):
+        """
+        Ajoute une ligne libellé + champ de saisie à une grille
+        
+        Args:
+            frame: Frame parent organisé en grille
+            row (int): Ligne de la grille
+            text (str): Libellé du champ
+            value: Valeur initiale du champ
+            width (int, optional): Largeur du champ, sinon celle de la base d'options
+            numeric (str, optional): "float" ou "int" pour filtrer la saisie au clavier
+            **options: Options supplémentaires du ttk.Entry (ex: show="*")
             
-            # Enregistrer les paramètres d'interface
-            ui_settings = {
-                'theme': self.theme_var.get(),
-                'chart_style': self.chart_style_var.get(),
-                'language': self.language_var.get(),
-                'show_welcome': self.show_welcome_var.get()
-            }
-            self.config_manager.set_ui_settings(ui_settings)
+        Returns:
+            ttk.Entry: Champ de saisie créé
+        """
+        ttk.Label(frame, text=text, style="Settings.TLabel").grid(row=row, column=0, sticky=tk.W)
+        entry = self._create_entry(frame, value, width, numeric, **options)
+        entry.grid(row=row, column=1, sticky=tk.W)
+        return entry
+    
+    def _add_entry_line(self, frame, text, value, label_width, width=None, numeric=None, help_text=None, **options):
+        """
+        Ajoute une ligne libellé + champ de saisie (+ explication) empilée avec pack
+        
+        Args:
+            frame: Frame parent organisé avec pack
+            text (str): Libellé du champ
+            value: Valeur initiale du champ
+            label_width (int): Largeur du libellé en caractères, pour aligner les champs
+            width (int, optional): Largeur du champ, sinon celle de la base d'options
+            numeric (str, optional): "float" ou "int" pour filtrer la saisie au clavier
+            help_text (str, optional): Explication affichée après le champ
+            **options: Options supplémentaires du ttk.Entry (ex: show="*")
             
-            # Enregistrer les paramètres de notification par email
-            email_settings = {
-                'enabled': self.email_enabled_var.get(),
-                'smtp_server': self.smtp_server_var.get(),
-                'smtp_port': self.smtp_port_var.get(),
-                'smtp_username': self.smtp_username_var.get(),
-                'smtp_password': self.smtp_password_var.get(),
-                'recipient': self.recipient_var.get()
-            }
-            self.config_manager.set_email_settings(email_settings)
+        Returns:
+            ttk.Entry: Champ de saisie créé
+        """
+        line = ttk.Frame(frame)
+        ttk.Label(line, text=text, width=label_width, style="Settings.TLabel").pack(side=tk.LEFT, padx=5)
+        entry = self._create_entry(line, value, width, numeric, **options)
+        entry.pack(side=tk.LEFT, padx=5)
+        if help_text:
+            ttk.Label(line, text=help_text, style="Settings.TLabel").pack(side=tk.LEFT, padx=5)
+        line.pack(fill=tk.X, pady=2)
+        return entry
+    
+    def _create_entry(self, parent, value, width=None, numeric=None, **options):
+        """
+        Crée un champ de saisie initialisé (sans le placer)
+        
+        Args:
+            parent: Widget parent
+            value: Valeur initiale du champ
+            width (int, optional): Largeur du champ, sinon celle de la base d'options
+            numeric (str, optional): "float" ou "int" pour filtrer la saisie au clavier
+            **options: Options supplémentaires du ttk.Entry (ex: show="*")
             
-            # Indiquer que les paramètres ont été enregistrés avec succès
-            self.result = True
+        Returns:
+            ttk.Entry: Champ de saisie créé
+        """
+        if numeric is not None:
+            options.update(validate="key", validatecommand=self._validators[numeric])
+        if width is not None:
+            options['width'] = width
+        entry = ttk.Entry(parent, style="Settings.TEntry", **options)
+        entry.insert(0, str(value))
+        return entry
+    
+    def test_email_config(self):
+        """Teste la configuration email dans un thread, sans bloquer l'interface"""
+        if not hasattr(self, 'email_entries'):
+            return
+        
+        # Paramètres actuels de l'interface
+        settings = {name: entry.get() for name, entry in self.email_entries.items()}
+        
+        result_queue = queue.Queue()
+        threading.Thread(target=self._smtp_test_worker, args=(settings, result_queue), daemon=True).start()
+        self.dialog.after(50, lambda: self._check_test_result(result_queue))
+    
+    def _smtp_test_worker(self, settings, result_queue):
+        """
+        Se connecte au serveur SMTP configuré (exécuté hors du thread Tk)
+        
+        Args:
+            settings (dict): Paramètres SMTP saisis
+            result_queue (queue.Queue): File recevant (succès, message)
+        """
+        try:
+            port = int(settings['smtp_port'])
+            context = ssl.create_default_context()
             
-            # Fermer la boîte de dialogue
-            self.dialog.destroy()
+            # Port 465: TLS implicite dès la connexion; sinon STARTTLS est obligatoire
+            # avant toute authentification pour ne jamais envoyer le mot de passe en clair
+            if port == SMTP_SSL_PORT:
+                server = smtplib.SMTP_SSL(settings['smtp_server'], port, timeout=10, context=context)
+            else:
+                server = smtplib.SMTP(settings['smtp_server'], port, timeout=10)
             
+            with server:
+                server.ehlo()
+                if port != SMTP_SSL_PORT:
+                    if not server.has_extn('starttls'):
+                        result_queue.put((False, "Le serveur SMTP ne prend pas en charge STARTTLS: "
+                                                 "connexion non chiffrée refusée (utilisez le port 465 pour SSL)."))
+                        return
+                    server.starttls(context=context)
+                    server.ehlo()
+                if settings['smtp_username']:
+                    server.login(settings['smtp_username'], settings['smtp_password'])
+            result_queue.put((True, "Connexion au serveur SMTP réussie."))
         except Exception as e:
-            self.logger.exception("Erreur lors de l'enregistrement des paramètres")
-            from tkinter import messagebox
-            messagebox.showerror("Erreur", f"Erreur lors de l'enregistrement des paramètres: {str(e)}")
\ No newline at end of file
+            self.logger.warning("Échec du test de la configuration email: %s", e)
+            result_queue.put((False, f"Échec de la connexion au serveur SMTP: {str(e)}"))
+    
+    def _check_test_result(self, result_queue):
+        """
+        Affiche le résultat du test email dès qu'il est disponible
+        
+        Args:
+            result_queue (queue.Queue): File alimentée par _smtp_test_worker
+        """
+        if not self.dialog.winfo_exists():
+            return
+        
+        try:
+            success, message = result_queue.get_nowait()
+        except queue.Empty:
+            self.dialog.after(50, lambda: self._check_test_result(result_queue))
+            return
+        
+        if success:
+            messagebox.showinfo("Test Email", message, parent=self.dialog)
+        else:
+            messagebox.showerror("Test Email", message, parent=self.dialog)
+    
+    def save_settings(self):
+        """Enregistre les paramètres"""
+        # Lire et convertir toutes les valeurs saisies avant d'écrire quoi que ce soit:
+        # une saisie invalide n'enregistre alors aucune section à moitié
+        # Les onglets jamais ouverts n'ont pas été modifiés: leur configuration est conservée
+        updates = []
+        
+        # Les champs numériques sont filtrés à la saisie: seuls un champ vide ou un
+        # intervalle inconnu peuvent encore échouer à la conversion
+        try:
+            # Seuils d'alerte
+            if str(self.alert_tab) in self._built:
+                alert_values = {name: float(entry.get()) for name, entry in self.alert_entries.items()}
+                alert_thresholds = {
+                    name: -value if name in _NEGATIVE_THRESHOLDS else value  # Pertes en négatif
+                    for name, value in alert_values.items()
+                }
+                updates.append(('alert', self.config_manager.set_alert_thresholds, alert_thresholds))
+            
+            # Paramètres de rafraîchissement
+            if str(self.refresh_tab) in self._built:
+                refresh_settings = {
+                    'auto_refresh': self.auto_refresh_var.get(),
+                    'refresh_interval': REFRESH_INTERVALS[self.refresh_interval_combo.get()],
+                    'history_days': int(self.history_days_entry.get())
+                }
+                updates.append(('refresh', self.config_manager.set_data_refresh_settings, refresh_settings))
+            
+            # Paramètres de notification par email
+            if str(self.email_tab) in self._built:
+                email_settings = {'enabled': self.email_enabled_var.get()}
+                email_settings.update((name, entry.get()) for name, entry in self.email_entries.items())
+                email_settings['smtp_port'] = int(email_settings['smtp_port'])
+                updates.append(('email', self.config_manager.set_email_settings, email_settings))
+        except (ValueError, KeyError, tk.TclError) as e:
+            self.logger.warning("Paramètres invalides: %s", e)
+            messagebox.showerror("Erreur", f"Valeur invalide dans les paramètres: {str(e)}", parent=self.dialog)
+            return
+        
+        # Paramètres d'interface
+        if str(self.ui_tab) in self._built:
+            ui_settings = {name: combo.get() for name, combo in self.ui_combos.items()}
+            ui_settings['show_welcome'] = self.show_welcome_var.get()
+            updates.append(('ui', self.config_manager.set_ui_settings, ui_settings))
+        
+        # Enregistrer uniquement les sections modifiées depuis l'ouverture
+        for section, setter, settings in updates:
+            if settings != self._cfg[section]:
+                setter(settings)
+        
+        # Indiquer que les paramètres ont été enregistrés avec succès
+        self.result = True
+        
+        # Fermer la boîte de dialogue
+        self._close()
@@ -5,19 +5,81 @@
 Boîte de dialogue d'analyse de VaR pour MT5 Trading Analyzer
 """
 
+import math
 import tkinter as tk
 from tkinter import ttk
 import logging
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
+from concurrent.futures import ThreadPoolExecutor
+from numpy.lib.stride_tricks import sliding_window_view
 from datetime import datetime, timedelta
 
+def _rolling_mean_std(values, window_size):
+    """
+    Moyenne et écart-type (ddof=1) glissants en O(N) par sommes cumulées
+    
+    Args:
+        values (np.ndarray): Rendements (float64)
+        window_size (int): Taille de la fenêtre
+        
+    Returns:
+        tuple: (moyennes, écarts-types) pour chaque fenêtre complète
+    """
+    cumsum = np.concatenate(([0.0], np.cumsum(values)))
+    cumsum2 = np.concatenate(([0.0], np.cumsum(values * values)))
+    sums = cumsum[window_size:] - cumsum[:-window_size]
+    sums2 = cumsum2[window_size:] - cumsum2[:-window_size]
+    
+    means = sums / window_size
+    # Variance non biaisée, bornée à 0 contre les erreurs d'arrondi de la soustraction
+    variances = np.maximum(sums2 / window_size - means * means, 0.0) * (window_size / (window_size - 1))
+    return means, np.sqrt(variances)
+
+def _tail_size(n, q):
+    """Nombre de rendements dans la queue de probabilité q d'un échantillon de taille n (au moins 1)"""
+    return max(1, int(n * q))
+
+def _var_and_es(values, q):
+    """
+    VaR historique et Expected Shortfall en une seule sélection partielle
+    
+    Les k = len * q plus faibles rendements forment la queue de distribution:
+    leur maximum donne la VaR, leur moyenne l'ES.
+    
+    Args:
+        values (np.ndarray): Rendements (float64)
+        q (float): Probabilité de queue (0.05 pour un niveau de confiance de 95%)
+        
+    Returns:
+        tuple: (VaR, ES) journalières en fraction
+    """
+    k = _tail_size(values.size, q)
+    tail = np.partition(values, k - 1)[:k]
+    return -tail.max(), -tail.mean()
+
+# Quantiles (level) de la loi normale centrée réduite, valeurs exactes de norm.ppf
+NORM_PPF = {0.95: 1.6448536269514722, 0.99: 2.3263478740408408}
+
+# Facteurs d'échelle par période (racine du nombre de jours de trading)
+_SQRT5 = math.sqrt(5)
+_SQRT22 = math.sqrt(22)
+_PERIOD_FACTORS = (("daily", 1.0), ("weekly", _SQRT5), ("monthly", _SQRT22))
+
+# Niveaux de confiance et z-scores associés
+_CONFIDENCE_LEVELS = (("95%", 0.95), ("99%", 0.99))
+_Z = {"95%": NORM_PPF[0.95], "99%": NORM_PPF[0.99]}
+
+# Exécuteur dédié aux calculs de VaR hors du thread Tk
+_EXECUTOR = ThreadPoolExecutor(max_workers=1)
+
 class VarDialog:
     """Boîte de dialogue d'analyse de Value at Risk (VaR)"""
     
+    # Résultats déjà calculés par méthode, partagés entre les ouvertures de la boîte de dialogue
+    _var_cache = {}
+    _var_cache_version = None
+    
     def __init__(self, parent, data_manager):
         """
         Initialisation de la boîte de dialogue VaR
@@ -29,12 +91,18 @@ class VarDialog:
         self.logger = logging.getLogger(__name__)
         self.data_manager = data_manager
         
+        # Empreinte et méthode du dernier affichage, et du calcul en cours
+        self._rendered = None
+        self._pending = None
+        self._future = None
+        
         # Création de la fenêtre de dialogue
         self.dialog = tk.Toplevel(parent)
         self.dialog.title("Analyse de VaR")
         self.dialog.geometry("600x500")
         self.dialog.transient(parent)  # Dialogue modal
         self.dialog.grab_set()
+        self.dialog.protocol("WM_DELETE_WINDOW", self._close)
         
         # Centrer la fenêtre
         self.dialog.update_idletasks()
@@ -80,12 +148,25 @@ class VarDialog:
         chart_frame = ttk.Frame(self.dialog)
         chart_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        # Création de la figure matplotlib
+        # Création de la figure matplotlib (import différé à l'ouverture de la boîte de dialogue)
+        from ui.widgets.chart_canvas import DebouncedFigureCanvas
+        from matplotlib.figure import Figure
         self.figure = Figure(figsize=(6, 4), dpi=100)
         self.plot = self.figure.add_subplot(111)
         
+        # Artistes créés une seule fois puis mis à jour (pas de reconstruction des axes)
+        self._var_line, = self.plot.plot([], [], 'b-', linewidth=2, label='VaR mensuelle (95%)')
+        self._minhl = self.plot.axhline(y=8, color='g', linestyle='--', alpha=0.7, label='Min recommandé (8%)')
+        self._maxhl = self.plot.axhline(y=10, color='r', linestyle='--', alpha=0.7, label='Max recommandé (10%)')
+        self._legend = self.plot.legend()
+        self._empty_text = self.plot.text(0.5, 0.5, "Données insuffisantes pour le calcul de VaR",
+                                          ha='center', va='center', transform=self.plot.transAxes, visible=False)
+        self.plot.set_xlabel("Date")
+        self.plot.set_ylabel("VaR mensuelle (%)")
+        self.plot.grid(True, linestyle='--', alpha=0.7)
+        
         # Intégration dans le widget Tkinter
-        self.canvas = FigureCanvasTkAgg(self.figure, chart_frame)
+        self.canvas = DebouncedFigureCanvas(self.figure, chart_frame)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         
         # Frame pour les résultats
@@ -96,61 +177,53 @@ class VarDialog:
         metrics_frame = ttk.Frame(results_frame)
         metrics_frame.pack(fill=tk.X, expand=True, padx=10, pady=10)
         
+        # Construire tous les labels de résultats, puis les placer en une seule passe
+        bold_font = ("TkDefaultFont", 9, "bold")
+        periods = ("daily", "weekly", "monthly")
+        cells = []
+        
         # Colonnes pour les résultats
-        columns = ["Métrique", "Daily", "Weekly", "Monthly"]
-        for i, col in enumerate(columns):
-            ttk.Label(metrics_frame, text=col, font=("TkDefaultFont", 9, "bold")).grid(
-                row=0, column=i, padx=5, pady=2, sticky=tk.W)
+        for i, col in enumerate(("Métrique", "Daily", "Weekly", "Monthly")):
+            cells.append((ttk.Label(metrics_frame, text=col, font=bold_font), 0, i, 1))
         
-        # Labels pour les résultats de VaR
+        # Lignes VaR et ES/CVaR pour chaque niveau de confiance et chaque période
         self.var_labels = {}
-        confidence_levels = ["95%", "99%"]
+        rows = (("VaR 95%", "var_95%"), ("VaR 99%", "var_99%"),
+                ("ES/CVaR 95%", "es_95"), ("ES/CVaR 99%", "es_99"))
         
-        for i, level in enumerate(confidence_levels, start=1):
-            ttk.Label(metrics_frame, text=f"VaR {level}").grid(
-                row=i, column=0, padx=5, pady=2, sticky=tk.W)
-            
-            # Labels pour chaque période (daily, weekly, monthly)
-            for j, period in enumerate(["daily", "weekly", "monthly"], start=1):
-                label_id = f"var_{level}_{period}"
-                self.var_labels[label_id] = ttk.Label(metrics_frame, text="-")
-                self.var_labels[label_id].grid(row=i, column=j, padx=5, pady=2, sticky=tk.W)
-        
-        # Labels pour ES/CVaR 95%
-        ttk.Label(metrics_frame, text="ES/CVaR 95%").grid(
-            row=3, column=0, padx=5, pady=2, sticky=tk.W)
-        
-        for j, period in enumerate(["daily", "weekly", "monthly"], start=1):
-            label_id = f"es_95_{period}"
-            self.var_labels[label_id] = ttk.Label(metrics_frame, text="-")
-            self.var_labels[label_id].grid(row=3, column=j, padx=5, pady=2, sticky=tk.W)
-        
-        # Labels pour ES/CVaR 99%
-        ttk.Label(metrics_frame, text="ES/CVaR 99%").grid(
-            row=4, column=0, padx=5, pady=2, sticky=tk.W)
-        
-        for j, period in enumerate(["daily", "weekly", "monthly"], start=1):
-            label_id = f"es_99_{period}"
-            self.var_labels[label_id] = ttk.Label(metrics_frame, text="-")
-            self.var_labels[label_id].grid(row=4, column=j, padx=5, pady=2, sticky=tk.W)
+        for i, (title, prefix) in enumerate(rows, start=1):
+            cells.append((ttk.Label(metrics_frame, text=title), i, 0, 1))
+            for j, period in enumerate(periods, start=1):
+                label = ttk.Label(metrics_frame, text="-")
+                self.var_labels[f"{prefix}_{period}"] = label
+                cells.append((label, i, j, 1))
         
         # Label pour le VaR Ratio
-        ttk.Label(metrics_frame, text="VaR Ratio (6m)").grid(
-            row=5, column=0, padx=5, pady=2, sticky=tk.W)
+        cells.append((ttk.Label(metrics_frame, text="VaR Ratio (6m)"), 5, 0, 1))
         self.var_labels["var_ratio"] = ttk.Label(metrics_frame, text="-")
-        self.var_labels["var_ratio"].grid(row=5, column=1, columnspan=3, padx=5, pady=2, sticky=tk.W)
+        cells.append((self.var_labels["var_ratio"], 5, 1, 3))
+        
+        for widget, row, column, span in cells:
+            widget.grid(row=row, column=column, columnspan=span, padx=5, pady=2, sticky=tk.W)
         
         # Frame pour les boutons
         button_frame = ttk.Frame(self.dialog)
         button_frame.pack(fill=tk.X, pady=10)
         
         # Bouton de fermeture
-        close_button = ttk.Button(button_frame, text="Fermer", command=self.dialog.destroy)
+        close_button = ttk.Button(button_frame, text="Fermer", command=self._close)
         close_button.pack(side=tk.RIGHT, padx=10)
         
         # Mettre à jour les calculs de VaR
         self.update_var_calculation()
     
+    def _close(self):
+        """Annule le calcul en attente et ferme la boîte de dialogue"""
+        if self._future is not None:
+            self._future.cancel()
+        self._pending = None
+        self.dialog.destroy()
+    
     def update_var_calculation(self):
         """Met à jour les calculs et l'affichage de VaR selon la méthode sélectionnée"""
         try:
@@ -162,244 +235,308 @@ class VarDialog:
             # Récupérer la méthode sélectionnée
             method = self.method_var.get()
             
-            # Calculer les rendements à partir des données d'équité
+            # Calculer les rendements à partir des données d'équité. La version est lue avant
+            # la série: si celle-ci change entre-temps, le pire est un calcul de trop.
+            data_version = self.data_manager.get_data_versions()["equity"]
             equity_series = self.data_manager.equity_data
             if equity_series is None or len(equity_series) < 10:  # Au moins 10 points de données nécessaires
                 self.clear_var_display()
                 return
             
-            # Calculer les rendements journaliers
-            returns = equity_series.pct_change().dropna()
+            # Les résultats ne dépendent que de la série d'équité et de la méthode: vider le
+            # cache si le DataManager a changé la version des données d'équité depuis le
+            # dernier calcul
+            if VarDialog._var_cache_version != data_version:
+                VarDialog._var_cache = {}
+                VarDialog._var_cache_version = data_version
             
-            # Calculer l'historique de VaR
-            self.calculate_var_history(returns, method)
+            # Rien à redessiner si ces résultats sont déjà affichés
+            if self._rendered == (data_version, method):
+                return
             
-            # Calculer les VaR actuelles pour différentes périodes et niveaux de confiance
-            self.calculate_current_var(returns, method)
+            results = self._var_cache.get(method)
+            if results is not None:
+                self._render_results(data_version, method, results)
+                return
+            
+            # Calcul déjà lancé pour ces données et cette méthode
+            if self._pending == (data_version, method):
+                return
+            
+            # Lancer le calcul en arrière-plan; un calcul précédent encore en attente est abandonné
+            if self._future is not None:
+                self._future.cancel()
+            self._pending = (data_version, method)
+            self._future = _EXECUTOR.submit(self._compute_results, equity_series, method, data_version)
             
         except Exception as e:
             self.logger.exception("Erreur lors du calcul de VaR")
             self.clear_var_display()
     
-    def calculate_var_history(self, returns, method):
+    def _compute_results(self, equity_series, method, data_version):
+        """
+        Calcule les résultats de VaR hors du thread Tk puis les transmet à l'interface
+        
+        Args:
+            equity_series (pd.Series): Série d'équité
+            method (str): Méthode de calcul de VaR
+            data_version (int): Version des données d'équité
+        """
+        try:
+            # Calculer les rendements journaliers
+            returns = equity_series.pct_change().dropna()
+            
+            # Historique de VaR et VaR actuelles pour différentes périodes et niveaux de confiance
+            results = (self.compute_var_history(returns, method), self.compute_current_var(returns, method))
+        except Exception as e:
+            self.logger.exception("Erreur lors du calcul de VaR")
+            results = (None, None)
+        
+        try:
+            self.dialog.after(0, lambda: self._apply_results(data_version, method, results))
+        except (tk.TclError, RuntimeError):
+            # La boîte de dialogue (ou l'application) a été fermée entre-temps
+            pass
+    
+    def _apply_results(self, data_version, method, results):
+        """
+        Enregistre et affiche les résultats d'un calcul terminé (thread Tk)
+        
+        Args:
+            data_version (int): Version des données d'équité calculées
+            method (str): Méthode de calcul de VaR
+            results (tuple): (historique de VaR, VaR actuelles)
+        """
+        # Un calcul échoué n'est pas mis en cache: il sera retenté au prochain affichage
+        if VarDialog._var_cache_version == data_version and all(r is not None for r in results):
+            self._var_cache[method] = results
+        
+        # Ignorer un calcul abandonné entre-temps (autre méthode, données effacées, fermeture)
+        if self._pending != (data_version, method) or not self.dialog.winfo_exists():
+            return
+        
+        self._pending = None
+        self._future = None
+        if method == self.method_var.get():
+            self._render_results(data_version, method, results)
+    
+    def _render_results(self, data_version, method, results):
         """
-        Calcule et affiche l'historique de VaR
+        Affiche l'historique de VaR et les VaR actuelles
+        
+        Args:
+            data_version (int): Version des données d'équité calculées
+            method (str): Méthode de calcul de VaR
+            results (tuple): (historique de VaR, VaR actuelles)
+        """
+        var_history, current_var = results
+        self.render_var_history(var_history, method)
+        self.render_current_var(current_var)
+        if var_history is not None and current_var is not None:
+            self._rendered = (data_version, method)
+    
+    def compute_var_history(self, returns, method):
+        """
+        Calcule l'historique de VaR
         
         Args:
             returns (pd.Series): Série de rendements
             method (str): Méthode de calcul de VaR
+            
+        Returns:
+            pd.Series: VaR mensuelle glissante à 95% (en pourcentage), ou None en cas d'erreur
         """
         try:
+            # Noyau Numba importé à la demande, sur le thread de calcul: l'import de numba
+            # (plus lourd que matplotlib) ne pèse ni sur le démarrage ni sur le thread Tk
+            from ui.dialogs._var_kernels import rolling_order_stat
+            
             # Période de VaR (6 mois par défaut)
             window_size = 126  # Environ 6 mois de jours de trading
             
             if len(returns) < window_size:
                 window_size = len(returns) // 2  # Utiliser la moitié des données si moins de 6 mois
             
-            # Créer des séries pour stocker l'historique de VaR
-            var_history = pd.Series(index=returns.index[window_size-1:], dtype=float)
-            
-            # Calculer la VaR glissante
-            for i in range(window_size-1, len(returns)):
-                window_returns = returns.iloc[i-window_size+1:i+1]
-                
-                if method == "Paramétrique":
-                    # VaR paramétrique (normale) à 95%
-                    mean = window_returns.mean()
-                    std = window_returns.std()
-                    var_95 = -(mean + 1.645 * std) * 100  # En pourcentage
-                elif method == "Historique":
-                    # VaR historique à 95%
-                    var_95 = -window_returns.quantile(0.05) * 100  # En pourcentage
-                else:  # Monte Carlo
-                    # VaR Monte Carlo à 95%
-                    var_95 = self.calculate_monte_carlo_var(window_returns, 0.95) * 100  # En pourcentage
-                
-                var_history.iloc[i-window_size+1] = var_95
-            
-            # Tracer le graphique
-            self.plot.clear()
-            self.plot.plot(var_history.index, var_history.values, 'b-', linewidth=2, label='VaR mensuelle (95%)')
-            
-            # Ajouter les limites recommandées
-            self.plot.axhline(y=8, color='g', linestyle='--', alpha=0.7, label='Min recommandé (8%)')
-            self.plot.axhline(y=10, color='r', linestyle='--', alpha=0.7, label='Max recommandé (10%)')
-            
-            # Formater le graphique
-            self.plot.set_title(f"Évolution de la VaR mensuelle (95%) - Méthode {method}")
-            self.plot.set_xlabel("Date")
-            self.plot.set_ylabel("VaR mensuelle (%)")
-            self.plot.legend()
-            self.plot.grid(True, linestyle='--', alpha=0.7)
-            self.figure.autofmt_xdate()
-            self.canvas.draw()
-            
-            # Calculer le VaR Ratio (max/min sur la période)
-            max_var = var_history.max()
-            min_var = var_history.min()
-            var_ratio = max_var / min_var if min_var > 0 else float('inf')
-            
-            # Mettre à jour le label de VaR Ratio
-            self.var_labels["var_ratio"].config(
-                text=f"{var_ratio:.2f}",
-                foreground="green" if var_ratio < 1.8 else "red"
-            )
+            values = np.asarray(returns.values, dtype=np.float64)
+            
+            # Calculer la VaR glissante à 95% (en pourcentage)
+            if method == "Paramétrique":
+                # VaR paramétrique (normale), moyenne et écart-type glissants en O(N)
+                means, stds = _rolling_mean_std(values, window_size)
+                var_95 = -(means + _Z["95%"] * stds) * 100
+            elif method == "Historique":
+                # VaR historique: statistique d'ordre de la queue à 5%, comme la VaR actuelle
+                k = _tail_size(window_size, 0.05) - 1
+                if rolling_order_stat is not None:
+                    # Noyau Numba compilé: sélection partielle de chaque fenêtre en parallèle
+                    var_95 = -rolling_order_stat(values, window_size, k) * 100
+                else:
+                    # Fenêtres glissantes: vue 2D (N-W+1, W) sans copie des rendements, sélection en O(W)
+                    windows = sliding_window_view(values, window_size)
+                    var_95 = -np.partition(windows, k, axis=1)[:, k] * 100
+            else:  # Monte Carlo
+                # Quantile gaussien en forme fermée, identique en loi à la simulation
+                means, stds = _rolling_mean_std(values, window_size)
+                var_95 = (NORM_PPF[0.95] * stds - means) * 100
+            
+            return pd.Series(var_95, index=returns.index[window_size-1:])
             
         except Exception as e:
             self.logger.exception("Erreur lors du calcul de l'historique de VaR")
-            self.plot.clear()
-            self.plot.text(0.5, 0.5, "Données insuffisantes pour le calcul de VaR", ha='center', va='center')
-            self.canvas.draw()
+            return None
+    
+    def render_var_history(self, var_history, method):
+        """
+        Affiche l'historique de VaR et le VaR Ratio
+        
+        Args:
+            var_history (pd.Series): Résultat de compute_var_history (None si le calcul a échoué)
+            method (str): Méthode de calcul de VaR
+        """
+        if var_history is None:
+            self.clear_var_chart()
+            return
+        
+        # Mettre à jour la courbe existante
+        self.plot.xaxis.update_units(var_history.index)
+        self._var_line.set_data(var_history.index, var_history.values)
+        self._set_chart_visible(True)
+        
+        # Formater le graphique
+        self.plot.set_title(f"Évolution de la VaR mensuelle (95%) - Méthode {method}")
+        self.plot.relim()
+        self.plot.autoscale_view()
+        self.figure.autofmt_xdate()
+        self.canvas.draw_idle()
+        
+        # Calculer le VaR Ratio (max/min sur la période)
+        max_var = var_history.max()
+        min_var = var_history.min()
+        var_ratio = max_var / min_var if min_var > 0 else float('inf')
+        
+        # Mettre à jour le label de VaR Ratio
+        self.var_labels["var_ratio"].config(
+            text=f"{var_ratio:.2f}",
+            foreground="green" if var_ratio < 1.8 else "red"
+        )
     
-    def calculate_current_var(self, returns, method):
+    def compute_current_var(self, returns, method):
         """
-        Calcule et affiche les VaR actuelles pour différentes périodes
+        Calcule les VaR et ES actuelles pour différentes périodes
         
         Args:
             returns (pd.Series): Série de rendements
             method (str): Méthode de calcul de VaR
+            
+        Returns:
+            dict: Identifiant de label -> valeur (en pourcentage), ou None en cas d'erreur
         """
         try:
-            # Prendre les 126 derniers rendements (environ 6 mois)
-            if len(returns) > 126:
-                recent_returns = returns.iloc[-126:]
-            else:
-                recent_returns = returns
-            
-            # Facteurs pour différentes périodes
-            period_factors = {
-                "daily": 1,
-                "weekly": np.sqrt(5),
-                "monthly": np.sqrt(22)
-            }
+            # Prendre les 126 derniers rendements (environ 6 mois), en tableau float64 contigu
+            values = np.ascontiguousarray(returns.to_numpy(dtype=np.float64))
+            recent_returns = values[-126:]
             
-            # Niveaux de confiance
-            confidence_levels = {
-                "95%": 0.95,
-                "99%": 0.99
-            }
+            results = {}
             
-            # Calculer la VaR pour chaque combinaison de période et niveau de confiance
-            for level_name, level in confidence_levels.items():
-                for period_name, factor in period_factors.items():
-                    # Calculer la VaR selon la méthode sélectionnée
-                    if method == "Paramétrique":
-                        # VaR paramétrique (normale)
-                        mean = recent_returns.mean()
-                        std = recent_returns.std()
-                        z_score = 1.645 if level == 0.95 else 2.326  # Z-score pour 95% ou 99%
-                        var_value = -(mean + z_score * std) * factor * 100  # En pourcentage
-                    elif method == "Historique":
-                        # VaR historique
-                        quantile = 1 - level
-                        var_value = -recent_returns.quantile(quantile) * factor * 100  # En pourcentage
-                    else:  # Monte Carlo
-                        # VaR Monte Carlo
-                        var_value = self.calculate_monte_carlo_var(recent_returns, level) * factor * 100  # En pourcentage
-                    
-                    # Mettre à jour le label correspondant
-                    label_id = f"var_{level_name}_{period_name}"
-                    self.var_labels[label_id].config(text=f"{var_value:.2f}%")
+            if method != "Historique":
+                # Paramètres de la loi normale, estimés une fois pour tous les niveaux et périodes
+                mean = np.mean(recent_returns)
+                std = np.std(recent_returns, ddof=1)
             
-            # Calculer l'Expected Shortfall (ES/CVaR)
-            es_95 = self.calculate_expected_shortfall(recent_returns, 0.95, period_factors)
-            es_99 = self.calculate_expected_shortfall(recent_returns, 0.99, period_factors)
+            # VaR historique et ES de chaque niveau de confiance en une seule sélection partielle
+            tails = {level_name: _var_and_es(recent_returns, 1 - level)
+                     for level_name, level in _CONFIDENCE_LEVELS}
             
-            # Mettre à jour les labels pour ES/CVaR
-            for period in ["daily", "weekly", "monthly"]:
-                # ES 95%
-                label_id = f"es_95_{period}"
-                self.var_labels[label_id].config(text=f"{es_95[period]:.2f}%")
+            # VaR journalière par niveau de confiance, puis mise à l'échelle par période
+            for level_name, level in _CONFIDENCE_LEVELS:
+                if method == "Paramétrique":
+                    var_daily = -(mean + _Z[level_name] * std)
+                elif method == "Historique":
+                    var_daily = tails[level_name][0]
+                else:  # Monte Carlo
+                    var_daily = self.calculate_monte_carlo_var(recent_returns, level, mean, std)
+                
+                # Expected Shortfall (ES/CVaR) issue de la même queue
+                es_daily = abs(tails[level_name][1])
+                es_id = level_name.rstrip("%")
                 
-                # ES 99%
-                label_id = f"es_99_{period}"
-                self.var_labels[label_id].config(text=f"{es_99[period]:.2f}%")
+                for period_name, factor in _PERIOD_FACTORS:
+                    results[f"var_{level_name}_{period_name}"] = var_daily * factor * 100  # En pourcentage
+                    results[f"es_{es_id}_{period_name}"] = es_daily * factor * 100
+            
+            return results
             
         except Exception as e:
             self.logger.exception("Erreur lors du calcul de la VaR actuelle")
-            self.clear_var_metrics()
+            return None
     
-    def calculate_monte_carlo_var(self, returns, confidence_level):
+    def render_current_var(self, current_var):
         """
-        Calcule la VaR par simulation Monte Carlo
+        Affiche les VaR et ES actuelles
         
         Args:
-            returns (pd.Series): Série de rendements
-            confidence_level (float): Niveau de confiance (0.95 ou 0.99)
-            
-        Returns:
-            float: VaR calculée
+            current_var (dict): Résultat de compute_current_var (None si le calcul a échoué)
         """
-        try:
-            # Estimer les paramètres de la distribution
-            mean = returns.mean()
-            std = returns.std()
-            
-            # Générer des scénarios aléatoires (10000 simulations)
-            np.random.seed(42)  # Pour la reproductibilité
-            n_simulations = 10000
-            simulated_returns = np.random.normal(mean, std, n_simulations)
-            
-            # Calculer la VaR à partir des simulations
-            var_quantile = 1 - confidence_level
-            var_value = -np.percentile(simulated_returns, var_quantile * 100)
-            
-            return var_value
-            
-        except Exception as e:
-            self.logger.exception("Erreur lors du calcul de la VaR Monte Carlo")
-            return 0
+        if current_var is None:
+            self.clear_var_metrics()
+            return
+        
+        for label_id, value in current_var.items():
+            self.var_labels[label_id].config(text=f"{value:.2f}%")
     
-    def calculate_expected_shortfall(self, returns, confidence_level, period_factors):
+    def calculate_monte_carlo_var(self, returns, confidence_level, mean=None, std=None):
         """
-        Calcule l'Expected Shortfall (ES) ou Conditional Value at Risk (CVaR)
+        Calcule la VaR Monte Carlo gaussienne
+        
+        Les scénarios étant tirés d'une loi normale de mêmes moyenne et écart-type,
+        leur quantile converge vers le quantile gaussien: il est calculé directement.
         
         Args:
-            returns (pd.Series): Série de rendements
-            confidence_level (float): Niveau de confiance (entre 0 et 1)
-            period_factors (dict): Dictionnaire avec facteurs pour différentes périodes
+            returns (pd.Series | np.ndarray): Série de rendements
+            confidence_level (float): Niveau de confiance (0.95 ou 0.99)
+            mean (float, optional): Moyenne déjà estimée. Si None, calculée sur returns.
+            std (float, optional): Écart-type (ddof=1) déjà estimé. Si None, calculé sur returns.
             
         Returns:
-            dict: ES pour différentes périodes
+            float: VaR calculée
         """
         try:
-            # Résultats pour différentes périodes
-            es_values = {}
-            
-            # Calculer le quantile pour la VaR
-            var_quantile = 1 - confidence_level
-            var_threshold = returns.quantile(var_quantile)
-            
-            # Filtrer les rendements dans la queue de distribution
-            tail_returns = returns[returns <= var_threshold]
-            
-            if len(tail_returns) == 0:
-                # Si aucun rendement ne tombe dans la queue, retourner zéros
-                return {period: 0 for period in period_factors}
-            
-            # Moyenne des rendements dans la queue
-            es_daily = tail_returns.mean()
-            
-            # Appliquer les facteurs de période
-            for period, factor in period_factors.items():
-                es_values[period] = abs(es_daily * factor * 100)  # En pourcentage
+            # Estimer les paramètres de la distribution s'ils ne sont pas fournis (Series ou tableau NumPy)
+            if mean is None:
+                mean = np.mean(returns)
+            if std is None:
+                std = np.std(returns, ddof=1)
             
-            return es_values
+            return float(NORM_PPF[confidence_level] * std - mean)
             
         except Exception as e:
-            self.logger.exception("Erreur lors du calcul de l'Expected Shortfall")
-            return {period: 0 for period in period_factors}
+            self.logger.exception("Erreur lors du calcul de la VaR Monte Carlo")
+            return 0
     
     def clear_var_display(self):
         """Efface l'affichage de VaR"""
+        self._rendered = None
+        self._pending = None
         self.clear_var_chart()
         self.clear_var_metrics()
     
     def clear_var_chart(self):
         """Efface le graphique de VaR"""
-        self.plot.clear()
-        self.plot.text(0.5, 0.5, "Données insuffisantes pour le calcul de VaR", ha='center', va='center')
-        self.canvas.draw()
+        self._var_line.set_data([], [])
+        self._set_chart_visible(False)
+        self.plot.set_title("")
+        self.canvas.draw_idle()
+    
+    def _set_chart_visible(self, visible):
+        """
+        Affiche la courbe, les limites et la légende, ou le message de données insuffisantes
+        
+        Args:
+            visible (bool): True pour afficher la courbe de VaR
+        """
+        for artist in (self._var_line, self._minhl, self._maxhl, self._legend):
+            artist.set_visible(visible)
+        self._empty_text.set_visible(not visible)
     
     def clear_var_metrics(self):
         """Efface les métriques de VaR"""
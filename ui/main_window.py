@@ -30,6 +30,21 @@ from ui.dialogs.d_leverage_dialog import DLeverageDialog
 from ui.dialogs.var_dialog import VarDialog
 from ui.dialogs.about_dialog import AboutDialog
 
+# Widgets rafraîchis par update_ui: (widget, onglet qui le contient ou None si toujours visible,
+# jeux de données du DataManager dont il dépend)
+_WIDGET_DATA = (
+    ("account_info_widget", None, ("account_info", "positions")),
+    ("alerts_widget", None, ("account_info", "positions")),  # Vérifie les alertes même masqué
+    ("equity_chart_widget", "overview_tab", ("equity",)),
+    ("performance_widget", "overview_tab", ("equity",)),
+    ("d_leverage_chart_widget", "overview_tab", ("account_info", "positions")),
+    ("positions_widget", "positions_tab", ("positions", "account_info")),
+    ("allocation_widget", "allocation_tab", ("positions",)),
+    ("benchmark_widget", "benchmark_tab", ("equity",)),
+    ("risk_score_widget", "risk_dashboard_tab", ("equity", "positions", "account_info")),
+    ("d_leverage_risk_widget", "risk_dashboard_tab", ("account_info", "positions")),
+)
+
 class MainWindow:
     """Classe de la fenêtre principale de l'application"""
     
@@ -54,9 +69,27 @@ class MainWindow:
         self.auto_refresh_enabled = self.config_manager.get("data_refresh", "auto_refresh", True)
         self.refresh_interval = self.config_manager.get("data_refresh", "refresh_interval", 60)
         
+        # Prochain rafraîchissement automatique programmé dans la boucle Tk
+        self._after_id = None
+        
+        # Au plus un rafraîchissement des données MT5 en cours
+        self._refresh_lock = threading.Lock()
+        
+        # Au plus une mise à jour de l'interface en attente dans la file Tk
+        self._ui_lock = threading.Lock()
+        self._ui_update_pending = False
+        self._ui_update_success = True
+        
+        # Versions des données vues par chaque widget lors de sa dernière mise à jour
+        self._widget_versions = {}
+        
+        # Table de mise à jour des widgets existants: (nom, onglet ou None, jeux de données, méthode update)
+        self._updaters = []
+        
         # Création de l'interface
         self.create_menu()
         self.create_widgets()
+        self._register_updaters()
         
         # Tentative de connexion automatique à MT5
         self.connect_to_mt5()
@@ -116,75 +149,62 @@ class MainWindow:
         self.overview_tab = ttk.Frame(self.tab_control)
         self.tab_control.add(self.overview_tab, text="Vue d'ensemble")
         
-        # Division en deux parties
-        overview_left_frame = ttk.Frame(self.overview_tab)
-        overview_left_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        
-        overview_right_frame = ttk.Frame(self.overview_tab)
-        overview_right_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
+        # Division en deux colonnes sur une seule grille: équité à gauche, performance et D-Leverage à droite
+        self.overview_tab.grid_columnconfigure(0, weight=1)
+        self.overview_tab.grid_columnconfigure(1, weight=1)
+        self.overview_tab.grid_rowconfigure(0, weight=1)
+        self.overview_tab.grid_rowconfigure(1, weight=1)
         
         # Graphique de l'équité (gauche)
-        self.equity_chart_widget = EquityChartWidget(overview_left_frame, self.data_manager)
-        self.equity_chart_widget.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.equity_chart_widget = EquityChartWidget(self.overview_tab, self.data_manager)
+        self.equity_chart_widget.grid(row=0, column=0, rowspan=2, sticky="nsew", padx=5, pady=5)
         
         # Statistiques de performance (droite haut)
-        self.performance_widget = PerformanceWidget(overview_right_frame, self.data_manager)
-        self.performance_widget.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.performance_widget = PerformanceWidget(self.overview_tab, self.data_manager)
+        self.performance_widget.grid(row=0, column=1, sticky="nsew", padx=5, pady=5)
         
-        # Ajout du widget D-Leverage dans le frame de droite (droite bas)
-        self.d_leverage_chart_widget = DLeverageChartWidget(overview_right_frame, self.data_manager)
-        self.d_leverage_chart_widget.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        # Ajout du widget D-Leverage (droite bas)
+        self.d_leverage_chart_widget = DLeverageChartWidget(self.overview_tab, self.data_manager)
+        self.d_leverage_chart_widget.grid(row=1, column=1, sticky="nsew", padx=5, pady=5)
         
         # Onglet 2: Positions
         self.positions_tab = ttk.Frame(self.tab_control)
         self.tab_control.add(self.positions_tab, text="Positions ouvertes")
         
-        # Widget des positions
-        self.positions_widget = PositionsWidget(self.positions_tab, self.data_manager)
-        self.positions_widget.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
         # Onglet 3: Allocation
         self.allocation_tab = ttk.Frame(self.tab_control)
         self.tab_control.add(self.allocation_tab, text="Allocation")
         
-        # Widget d'allocation
-        self.allocation_widget = AllocationWidget(self.allocation_tab, self.data_manager)
-        self.allocation_widget.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
         # Onglet 4: Benchmarking
         self.benchmark_tab = ttk.Frame(self.tab_control)
         self.tab_control.add(self.benchmark_tab, text="Benchmarking")
         
-        # Widget de benchmarking
-        self.benchmark_widget = BenchmarkWidget(self.benchmark_tab, self.data_manager)
-        self.benchmark_widget.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
         # Onglet 5: Alertes et Optimisation
         self.alerts_tab = ttk.Frame(self.tab_control)
         self.tab_control.add(self.alerts_tab, text="Alertes & Optimisation")
         
-        # Widget des alertes
+        # Widget des alertes (créé immédiatement: il vérifie les alertes à chaque rafraîchissement)
         self.alerts_widget = AlertsWidget(self.alerts_tab, self.data_manager, self.config_manager)
         self.alerts_widget.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         # Onglet 6: Tableau de bord risque
-        risk_dashboard_tab = ttk.Frame(self.tab_control)
-        self.tab_control.add(risk_dashboard_tab, text="Tableau de bord risque")
-        
-        # Diviser l'onglet en deux parties
-        risk_top_frame = ttk.Frame(risk_dashboard_tab)
-        risk_top_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        risk_bottom_frame = ttk.Frame(risk_dashboard_tab)
-        risk_bottom_frame.pack(fill=tk.X, padx=5, pady=5)
-        
-        # Créer le widget de score de risque global
-        self.risk_score_widget = RiskScoreWidget(risk_top_frame, self.data_manager)
-        self.risk_score_widget.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        # Créer le widget de visualisation D-Leverage
-        d_leverage_widget_risk = DLeverageChartWidget(risk_bottom_frame, self.data_manager)
-        d_leverage_widget_risk.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.risk_dashboard_tab = ttk.Frame(self.tab_control)
+        self.tab_control.add(self.risk_dashboard_tab, text="Tableau de bord risque")
+        
+        # Les widgets des onglets non visibles sont créés à leur première sélection
+        self.positions_widget = None
+        self.allocation_widget = None
+        self.benchmark_widget = None
+        self.risk_score_widget = None
+        self.d_leverage_risk_widget = None
+        self._tab_builders = {
+            str(self.positions_tab): (self.positions_tab, self.create_positions_tab),
+            str(self.allocation_tab): (self.allocation_tab, self.create_allocation_tab),
+            str(self.benchmark_tab): (self.benchmark_tab, self.create_benchmark_tab),
+            str(self.risk_dashboard_tab): (self.risk_dashboard_tab, self.create_risk_dashboard_tab),
+        }
+        self._built = set()
+        self.tab_control.bind("<<NotebookTabChanged>>", self._on_tab_changed)
         
         # ==== PARTIE INFÉRIEURE ====
         self.bottom_frame = ttk.Frame(self.main_paned)
@@ -212,6 +232,68 @@ class MainWindow:
         refresh_button = ttk.Button(control_frame, text="Rafraîchir les données", command=self.refresh_data)
         refresh_button.pack(side=tk.RIGHT, padx=5)
     
+    def _on_tab_changed(self, event):
+        """Construit l'onglet sélectionné si nécessaire et rattrape les mises à jour manquées"""
+        tab_id = event.widget.select()
+        if tab_id not in self._built and tab_id in self._tab_builders:
+            tab, builder = self._tab_builders[tab_id]
+            builder(tab)
+            self._built.add(tab_id)
+            self._register_updaters()
+        
+        # Les widgets de l'onglet n'ont pas été mis à jour tant qu'il était masqué
+        if self.data_manager.connected:
+            self._update_widgets(tab_id)
+    
+    def create_positions_tab(self, parent):
+        """
+        Crée le contenu de l'onglet des positions
+        
+        Args:
+            parent: Frame de l'onglet
+        """
+        self.positions_widget = PositionsWidget(parent, self.data_manager)
+        self.positions_widget.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+    
+    def create_allocation_tab(self, parent):
+        """
+        Crée le contenu de l'onglet d'allocation
+        
+        Args:
+            parent: Frame de l'onglet
+        """
+        self.allocation_widget = AllocationWidget(parent, self.data_manager)
+        self.allocation_widget.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+    
+    def create_benchmark_tab(self, parent):
+        """
+        Crée le contenu de l'onglet de benchmarking
+        
+        Args:
+            parent: Frame de l'onglet
+        """
+        self.benchmark_widget = BenchmarkWidget(parent, self.data_manager)
+        self.benchmark_widget.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+    
+    def create_risk_dashboard_tab(self, parent):
+        """
+        Crée le contenu de l'onglet du tableau de bord risque
+        
+        Args:
+            parent: Frame de l'onglet
+        """
+        # Diviser l'onglet en deux parties: le score prend la hauteur disponible
+        parent.grid_columnconfigure(0, weight=1)
+        parent.grid_rowconfigure(0, weight=1)
+        
+        # Créer le widget de score de risque global
+        self.risk_score_widget = RiskScoreWidget(parent, self.data_manager)
+        self.risk_score_widget.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
+        
+        # Créer le widget de visualisation D-Leverage
+        self.d_leverage_risk_widget = DLeverageChartWidget(parent, self.data_manager)
+        self.d_leverage_risk_widget.grid(row=1, column=0, sticky="nsew", padx=10, pady=10)
+    
     def connect_to_mt5(self):
         """Connexion à MetaTrader 5"""
         self.status_bar.set_status("Connexion à MT5 en cours...")
@@ -229,7 +311,9 @@ class MainWindow:
         """Gère le résultat de la connexion MT5"""
         if success:
             self.status_bar.set_status(message, "success")
-            self.refresh_data()
+            # La connexion a déjà chargé toutes les données (DataManager.connect_to_mt5):
+            # seuls les widgets dont les données ont changé sont mis à jour
+            self._schedule_ui_update()
         else:
             self.status_bar.set_status(message, "error")
             messagebox.showerror("Erreur de connexion", message)
@@ -240,36 +324,96 @@ class MainWindow:
             self.status_bar.set_status("Non connecté à MT5", "error")
             return
         
+        # Un rafraîchissement est déjà en cours: il fournira les données à jour
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        
         self.status_bar.set_status("Rafraîchissement des données en cours...")
         
         # Exécuter le rafraîchissement dans un thread pour éviter de bloquer l'interface
         def refresh_thread():
-            success = self.data_manager.refresh_all_data()
+            try:
+                success = self.data_manager.refresh_all_data()
+            finally:
+                self._refresh_lock.release()
             
             # Mettre à jour l'interface dans le thread principal
-            self.root.after(0, lambda: self.update_ui(success))
+            self._schedule_ui_update(success)
         
         threading.Thread(target=refresh_thread, daemon=True).start()
     
+    def _schedule_ui_update(self, success=True):
+        """
+        Programme une mise à jour de l'interface depuis n'importe quel thread
+        
+        Si une mise à jour est déjà en attente, elle utilisera ce résultat au lieu
+        d'en empiler une nouvelle dans la file d'événements Tk.
+        
+        Args:
+            success (bool): Résultat du dernier rafraîchissement des données
+        """
+        with self._ui_lock:
+            self._ui_update_success = success
+            if self._ui_update_pending:
+                return
+            self._ui_update_pending = True
+        
+        self.root.after(0, self._run_ui_update)
+    
+    def _run_ui_update(self):
+        """Exécute la mise à jour de l'interface en attente (thread principal)"""
+        with self._ui_lock:
+            self._ui_update_pending = False
+            success = self._ui_update_success
+        
+        self.update_ui(success)
+    
     def update_ui(self, success=True):
         """Met à jour l'interface utilisateur avec les nouvelles données"""
         if success:
-            # Mettre à jour tous les widgets
-            self.account_info_widget.update()
-            self.equity_chart_widget.update()
-            self.performance_widget.update()
-            self.positions_widget.update()
-            self.allocation_widget.update()
-            self.benchmark_widget.update()
-            self.alerts_widget.update()
-            self.risk_score_widget.update()
-            self.d_leverage_chart_widget.update()
+            # Mettre à jour les widgets visibles dont les données ont changé
+            self._update_widgets(self.tab_control.select())
+            
+            # Traiter les redessins en attente en une seule fois
+            self.root.update_idletasks()
             
             # Mettre à jour le statut
             self.status_bar.set_status(f"Données rafraîchies à {time.strftime('%H:%M:%S')}", "success")
         else:
             self.status_bar.set_status("Erreur lors du rafraîchissement des données", "error")
     
+    def _register_updaters(self):
+        """Ajoute à la table de mise à jour les widgets créés depuis le dernier enregistrement"""
+        registered = {name for name, _, _, _ in self._updaters}
+        for name, tab_name, keys in _WIDGET_DATA:
+            widget = getattr(self, name)
+            if widget is None or name in registered:
+                continue
+            
+            # Résolus une seule fois: identifiant Tk de l'onglet et méthode de mise à jour
+            tab_id = str(getattr(self, tab_name)) if tab_name is not None else None
+            self._updaters.append((name, tab_id, keys, widget.update))
+    
+    def _update_widgets(self, tab_id):
+        """
+        Met à jour les widgets toujours visibles et ceux de l'onglet sélectionné, si leurs données ont changé
+        
+        Args:
+            tab_id (str): Identifiant Tk de l'onglet sélectionné
+        """
+        versions = self.data_manager.get_data_versions()
+        widget_versions = self._widget_versions
+        
+        for name, widget_tab, keys, update in self._updaters:
+            # Widget placé dans un onglet masqué
+            if widget_tab is not None and widget_tab != tab_id:
+                continue
+            
+            seen = tuple(versions[key] for key in keys)
+            if widget_versions.get(name) != seen:
+                widget_versions[name] = seen
+                update()
+    
     def toggle_auto_refresh(self):
         """Active/désactive le rafraîchissement automatique"""
         self.auto_refresh_enabled = self.auto_refresh_var.get()
@@ -281,48 +425,58 @@ class MainWindow:
             self.start_background_monitoring()
             self.status_bar.set_status("Rafraîchissement automatique activé")
         else:
+            self.stop_background_monitoring()
             self.status_bar.set_status("Rafraîchissement automatique désactivé")
     
     def start_background_monitoring(self):
         """Démarrer la surveillance en arrière-plan"""
         if not self.auto_refresh_enabled:
             return
-            
-        def monitoring_thread():
-            while self.auto_refresh_enabled:
-                if self.data_manager.connected:
-                    # Rafraîchir les données
-                    self.data_manager.refresh_all_data()
-                    
-                    # Mettre à jour l'interface dans le thread principal
-                    self.root.after(0, self.update_ui)
-                    
-                    # Vérifier les alertes
-                    # La vérification des alertes est faite dans le widget AlertsWidget
-                
-                # Attendre l'intervalle de rafraîchissement
-                for _ in range(self.refresh_interval):
-                    if not self.auto_refresh_enabled:
-                        break
-                    time.sleep(1)
-        
-        # Démarrer le thread
-        thread = threading.Thread(target=monitoring_thread, daemon=True)
-        thread.start()
+        
+        # Ne pas programmer une seconde surveillance si la précédente est active
+        if self._after_id is not None:
+            return
+        
+        self._tick()
+    
+    def stop_background_monitoring(self):
+        """Arrêter la surveillance en arrière-plan"""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+    
+    def _tick(self):
+        """Rafraîchit les données si connecté puis programme le prochain rafraîchissement"""
+        self._after_id = None
+        if not self.auto_refresh_enabled:
+            return
+        
+        if self.data_manager.connected:
+            # Le rafraîchissement lui-même s'exécute dans un thread (voir refresh_data)
+            self.refresh_data()
+        
+        self._after_id = self.root.after(self.refresh_interval * 1000, self._tick)
     
     def show_settings(self):
         """Afficher la boîte de dialogue des paramètres"""
-        dialog = SettingsDialog(self.root, self.config_manager)
+        SettingsDialog(self.root, self.config_manager).show(self.on_settings_closed)
+    
+    def on_settings_closed(self, result):
+        """
+        Applique les paramètres à la fermeture de la boîte de dialogue
         
+        Args:
+            result (bool): True si les paramètres ont été enregistrés
+        """
         # Si les paramètres ont été modifiés, mettre à jour l'application
-        if dialog.result:
+        if result:
             self.refresh_interval = self.config_manager.get("data_refresh", "refresh_interval", 60)
             self.alerts_widget.load_thresholds()
     
     def show_d_leverage_optimizer(self):
         """Afficher l'optimiseur de D-Leverage"""
         if not self.data_manager.connected:
-            messagebox.showwarning("Non connecté", "Veuillez vous connecter à MT5 d'abord")
+            self.status_bar.show_toast("Veuillez vous connecter à MT5 d'abord", "warning")
             return
             
         dialog = DLeverageDialog(self.root, self.data_manager)
@@ -330,7 +484,7 @@ class MainWindow:
     def show_var_analysis(self):
         """Afficher l'analyse de VaR"""
         if not self.data_manager.connected:
-            messagebox.showwarning("Non connecté", "Veuillez vous connecter à MT5 d'abord")
+            self.status_bar.show_toast("Veuillez vous connecter à MT5 d'abord", "warning")
             return
             
         dialog = VarDialog(self.root, self.data_manager)
@@ -338,7 +492,7 @@ class MainWindow:
     def export_report(self):
         """Exporter un rapport complet"""
         if not self.data_manager.connected:
-            messagebox.showwarning("Non connecté", "Veuillez vous connecter à MT5 d'abord")
+            self.status_bar.show_toast("Veuillez vous connecter à MT5 d'abord", "warning")
             return
             
         messagebox.showinfo("Export de rapport", "Cette fonctionnalité sera disponible dans une future mise à jour.")
@@ -349,6 +503,7 @@ class MainWindow:
     
     def quit_application(self):
         """Quitter l'application proprement"""
+        self.stop_background_monitoring()
         if self.data_manager.connected:
             self.data_manager.disconnect()
         
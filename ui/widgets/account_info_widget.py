@@ -10,9 +10,21 @@ from tkinter import ttk
 import logging
 from utils.helpers import format_currency, format_percentage
 
+# Gabarits des textes affichés (méthodes format liées une seule fois)
+_FMT_ACCOUNT = "Compte: {} ({})".format
+_FMT_BALANCE = "Balance: {}".format
+_FMT_EQUITY = "Équité: {}".format
+_FMT_PROFIT = "Profit flottant: {}".format
+_FMT_MARGIN = "Marge utilisée: {} ({})".format
+_FMT_MARGIN_LEVEL = "Niveau de marge: {}".format
+_FMT_D_LEVERAGE = "D-Leverage: {:.2f}".format
+_FMT_MONTHLY_VAR = "VaR mensuelle: {}".format
+
 class AccountInfoWidget(ttk.LabelFrame):
     """Widget affichant les informations du compte MT5"""
     
+    _styles_initialized = False
+    
     def __init__(self, parent, data_manager):
         """
         Initialisation du widget d'informations du compte
@@ -25,6 +37,20 @@ class AccountInfoWidget(ttk.LabelFrame):
         self.logger = logging.getLogger(__name__)
         self.data_manager = data_manager
         
+        # Styles de couleur du profit, configurés une seule fois pour l'application
+        if not AccountInfoWidget._styles_initialized:
+            style = ttk.Style()
+            style.configure("Good.TLabel", foreground="green")
+            style.configure("Bad.TLabel", foreground="red")
+            AccountInfoWidget._styles_initialized = True
+        
+        # Dernières valeurs et derniers textes affichés
+        self._last_snapshot = None
+        self._last_texts = None
+        self._profit_style = "TLabel"
+        # Les labels affichent déjà les valeurs par défaut
+        self._is_reset = True
+        
         self.create_widgets()
     
     def create_widgets(self):
@@ -37,64 +63,92 @@ class AccountInfoWidget(ttk.LabelFrame):
         account_right_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
         
         # Colonne gauche - Informations basiques
-        self.account_label = ttk.Label(account_left_frame, text="Non connecté")
+        self.account_var = tk.StringVar(value="Non connecté")
+        self.account_label = ttk.Label(account_left_frame, textvariable=self.account_var)
         self.account_label.pack(anchor=tk.W, pady=2)
         
-        self.balance_label = ttk.Label(account_left_frame, text="Balance: -")
+        self.balance_var = tk.StringVar(value="Balance: -")
+        self.balance_label = ttk.Label(account_left_frame, textvariable=self.balance_var)
         self.balance_label.pack(anchor=tk.W, pady=2)
         
-        self.equity_label = ttk.Label(account_left_frame, text="Équité: -")
+        self.equity_var = tk.StringVar(value="Équité: -")
+        self.equity_label = ttk.Label(account_left_frame, textvariable=self.equity_var)
         self.equity_label.pack(anchor=tk.W, pady=2)
         
-        self.profit_label = ttk.Label(account_left_frame, text="Profit flottant: -")
+        self.profit_var = tk.StringVar(value="Profit flottant: -")
+        self.profit_label = ttk.Label(account_left_frame, textvariable=self.profit_var)
         self.profit_label.pack(anchor=tk.W, pady=2)
         
         # Colonne droite - Informations de marge et risque
-        self.margin_label = ttk.Label(account_right_frame, text="Marge utilisée: -")
+        self.margin_var = tk.StringVar(value="Marge utilisée: -")
+        self.margin_label = ttk.Label(account_right_frame, textvariable=self.margin_var)
         self.margin_label.pack(anchor=tk.W, pady=2)
         
-        self.margin_level_label = ttk.Label(account_right_frame, text="Niveau de marge: -")
+        self.margin_level_var = tk.StringVar(value="Niveau de marge: -")
+        self.margin_level_label = ttk.Label(account_right_frame, textvariable=self.margin_level_var)
         self.margin_level_label.pack(anchor=tk.W, pady=2)
         
-        self.d_leverage_label = ttk.Label(account_right_frame, text="D-Leverage: -")
+        self.d_leverage_var = tk.StringVar(value="D-Leverage: -")
+        self.d_leverage_label = ttk.Label(account_right_frame, textvariable=self.d_leverage_var)
         self.d_leverage_label.pack(anchor=tk.W, pady=2)
         
-        self.var_label = ttk.Label(account_right_frame, text="VaR mensuelle: -")
+        self.monthly_var_var = tk.StringVar(value="VaR mensuelle: -")
+        self.var_label = ttk.Label(account_right_frame, textvariable=self.monthly_var_var)
         self.var_label.pack(anchor=tk.W, pady=2)
+        
+        # Variables des labels dans l'ordre des textes construits par update
+        self._text_vars = (self.account_var, self.balance_var, self.equity_var, self.profit_var,
+                           self.margin_var, self.margin_level_var, self.d_leverage_var, self.monthly_var_var)
     
     def update(self):
         """Met à jour les informations du compte"""
-        if not self.data_manager.connected or not self.data_manager.account_info:
+        account = self.data_manager.account_snapshot
+        if not self.data_manager.connected or not account:
             self.reset_labels()
             return
         
         try:
-            # Informations de base
-            account_info = self.data_manager.account_info
-            currency = account_info.currency
-            
-            # Mise à jour des labels d'information de base
-            self.account_label.config(text=f"Compte: {account_info.login} ({account_info.server})")
-            self.balance_label.config(text=f"Balance: {format_currency(account_info.balance, currency)}")
-            self.equity_label.config(text=f"Équité: {format_currency(account_info.equity, currency)}")
+            # Instantané calculé par le gestionnaire de données à chaque rafraîchissement
+            currency = account["currency"]
+            balance, equity, profit, margin = account["balance"], account["equity"], account["profit"], account["margin"]
+            margin_pct = account["margin_pct"]
+            margin_level = account["margin_level"]
+            d_leverage = account["d_leverage"]
+            monthly_var = account["monthly_var"]
             
-            # Calcul des profits
-            self.profit_label.config(text=f"Profit flottant: {format_currency(account_info.profit, currency, include_sign=True)}")
+            # Rien à faire si aucune valeur affichée n'a changé depuis la dernière mise à jour
+            snapshot = (account["login"], account["server"], currency, balance, equity, profit, margin,
+                        margin_pct, margin_level, d_leverage, monthly_var)
+            if snapshot == self._last_snapshot:
+                return
+            self._last_snapshot = snapshot
+            self._is_reset = False
             
-            # Informations de marge
-            margin_pct = self.data_manager.get_current_margin_percentage()
-            self.margin_label.config(text=f"Marge utilisée: {format_currency(account_info.margin, currency)} ({format_percentage(margin_pct)})")
+            fc = format_currency
+            fp = format_percentage
+            texts = (
+                _FMT_ACCOUNT(account["login"], account["server"]),
+                _FMT_BALANCE(fc(balance, currency)),
+                _FMT_EQUITY(fc(equity, currency)),
+                _FMT_PROFIT(fc(profit, currency, include_sign=True)),
+                _FMT_MARGIN(fc(margin, currency), fp(margin_pct)),
+                _FMT_MARGIN_LEVEL(fp(margin_level)),
+                _FMT_D_LEVERAGE(d_leverage),
+                _FMT_MONTHLY_VAR(fp(monthly_var)),
+            )
             
-            margin_level = self.data_manager.get_margin_level()
-            self.margin_level_label.config(text=f"Niveau de marge: {format_percentage(margin_level)}")
+            # Ne modifier que les textes qui ont changé
+            last_texts = self._last_texts or (None,) * len(texts)
+            for text_var, text, last_text in zip(self._text_vars, texts, last_texts):
+                if text != last_text:
+                    text_var.set(text)
+            self._last_texts = texts
             
-            # D-Leverage
-            d_leverage = self.data_manager.calculate_d_leverage()
-            self.d_leverage_label.config(text=f"D-Leverage: {d_leverage:.2f}")
-            
-            # VaR mensuelle
-            monthly_var = self.data_manager.calculate_monthly_var()
-            self.var_label.config(text=f"VaR mensuelle: {format_percentage(monthly_var)}")
+            # Couleur du profit flottant selon son signe, par nom de style
+            profit_style = "Good.TLabel" if profit >= 0 else "Bad.TLabel"
+            if profit_style != self._profit_style:
+                self.profit_label.configure(style=profit_style)
+                self._profit_style = profit_style
             
         except Exception as e:
             self.logger.exception("Erreur lors de la mise à jour des informations du compte")
@@ -102,11 +156,19 @@ class AccountInfoWidget(ttk.LabelFrame):
     
     def reset_labels(self):
         """Réinitialise les labels avec des valeurs par défaut"""
-        self.account_label.config(text="Non connecté")
-        self.balance_label.config(text="Balance: -")
-        self.equity_label.config(text="Équité: -")
-        self.profit_label.config(text="Profit flottant: -")
-        self.margin_label.config(text="Marge utilisée: -")
-        self.margin_level_label.config(text="Niveau de marge: -")
-        self.d_leverage_label.config(text="D-Leverage: -")
-        self.var_label.config(text="VaR mensuelle: -")
\ No newline at end of file
+        # Rien à faire si les labels affichent déjà les valeurs par défaut
+        if self._is_reset:
+            return
+        self._last_snapshot = None
+        self._last_texts = None
+        self.profit_label.configure(style="TLabel")
+        self._profit_style = "TLabel"
+        self.account_var.set("Non connecté")
+        self.balance_var.set("Balance: -")
+        self.equity_var.set("Équité: -")
+        self.profit_var.set("Profit flottant: -")
+        self.margin_var.set("Marge utilisée: -")
+        self.margin_level_var.set("Niveau de marge: -")
+        self.d_leverage_var.set("D-Leverage: -")
+        self.monthly_var_var.set("VaR mensuelle: -")
+        self._is_reset = True
\ No newline at end of file
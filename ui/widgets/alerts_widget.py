@@ -8,8 +8,68 @@ Widget des alertes et optimisations pour MT5 Trading Analyzer
 import tkinter as tk
 from tkinter import ttk
 import logging
+from collections import deque
 from datetime import datetime
 
+# Tag de coloration de chaque type d'alerte
+_ALERT_TAGS = {"RISQUE": "risk", "ATTENTION": "warning", "INFO": "info"}
+
+# Nombre maximal d'alertes affichées
+MAX_ALERTS = 50
+
+# Nombre maximal de suggestions d'optimisation conservées
+MAX_SUGGESTIONS = 10
+
+# Bits des alertes déclenchées retournés par _evaluate_alerts
+ALERT_MARGIN = 1
+ALERT_D_LEVERAGE = 2
+ALERT_D_LEVERAGE_TARGET = 4
+ALERT_VAR = 8
+
+# D-Leverage cible et catégorie selon la durée moyenne des positions (index retourné par _evaluate_alerts)
+_D_LEVERAGE_TARGETS = ((16.25, "Scalping (<30min)"), (13, "Intraday (30-60min)"), (9.75, "Swing (>60min)"))
+
+def _evaluate_alerts(margin_pct, d_leverage, monthly_var, avg_duration,
+                     thresh_margin, thresh_d_leverage, thresh_var):
+    """
+    Décide quelles alertes se déclenchent, sans formatage de message
+    
+    Args:
+        margin_pct (float): Marge utilisée en %
+        d_leverage (float): D-Leverage actuel
+        monthly_var (float): VaR mensuelle en %
+        avg_duration (float): Durée moyenne des positions en minutes
+        thresh_margin (float): Seuil de marge
+        thresh_d_leverage (float): Seuil de D-Leverage
+        thresh_var (float): Seuil de VaR mensuelle
+    
+    Returns:
+        tuple: (bits ALERT_*, index dans _D_LEVERAGE_TARGETS, réduction de volume nécessaire en %)
+    """
+    flags = 0
+    if margin_pct > thresh_margin:
+        flags |= ALERT_MARGIN
+    
+    target_index = 2
+    reduction_needed = 0.0
+    if d_leverage > thresh_d_leverage:
+        flags |= ALERT_D_LEVERAGE
+        if avg_duration < 30:  # Scalping
+            target_index = 0
+            target_d_leverage = 16.25
+        elif avg_duration < 60:  # Intraday
+            target_index = 1
+            target_d_leverage = 13.0
+        else:  # Swing
+            target_d_leverage = 9.75
+        if d_leverage > target_d_leverage:
+            flags |= ALERT_D_LEVERAGE_TARGET
+            reduction_needed = (d_leverage - target_d_leverage) / d_leverage * 100
+    
+    if monthly_var > thresh_var:
+        flags |= ALERT_VAR
+    return flags, target_index, reduction_needed
+
 class AlertsWidget(ttk.Frame):
     """Widget affichant les alertes de risque et les suggestions d'optimisation"""
     
@@ -27,6 +87,15 @@ class AlertsWidget(ttk.Frame):
         self.data_manager = data_manager
         self.config_manager = config_manager
         
+        # Mise à jour programmée sur la boucle Tk (regroupe les demandes rapprochées)
+        self._update_pending = False
+        
+        # Identifiants des alertes affichées, de la plus récente à la plus ancienne
+        self._alert_iids = deque()
+        
+        # Suggestions affichées (en-tête, texte), de la plus récente à la plus ancienne
+        self._suggestions = deque(maxlen=MAX_SUGGESTIONS)
+        
         # Charger les seuils d'alerte
         self.load_thresholds()
         
@@ -73,6 +142,11 @@ class AlertsWidget(ttk.Frame):
         self.alerts_tree.column("message", width=300)
         self.alerts_tree.column("value", width=100)
         
+        # Configurer les tags pour la coloration
+        self.alerts_tree.tag_configure("risk", foreground="red")
+        self.alerts_tree.tag_configure("warning", foreground="orange")
+        self.alerts_tree.tag_configure("info", foreground="blue")
+        
         # Ajout de la barre de défilement
         scrollbar = ttk.Scrollbar(alerts_frame, orient="vertical", command=self.alerts_tree.yview)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
@@ -86,6 +160,7 @@ class AlertsWidget(ttk.Frame):
         
         # Zone de texte pour les optimisations
         self.optim_text = tk.Text(optim_frame, height=10, wrap=tk.WORD)
+        self.optim_text.tag_configure("title", font=('TkDefaultFont', 9, 'bold'))
         
         # Ajout de la barre de défilement
         optim_scrollbar = ttk.Scrollbar(optim_frame, orient="vertical", command=self.optim_text.yview)
@@ -95,6 +170,20 @@ class AlertsWidget(ttk.Frame):
         self.optim_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
     
     def update(self):
+        """
+        Demande la mise à jour des alertes et optimisations
+        Les demandes reçues avant que la boucle Tk ne soit inactive donnent une seule vérification
+        """
+        if not self._update_pending:
+            self._update_pending = True
+            self.after_idle(self._flush_update)
+    
+    def _flush_update(self):
+        """Exécute la mise à jour programmée"""
+        self._update_pending = False
+        self._do_update()
+    
+    def _do_update(self):
         """Met à jour les alertes et optimisations"""
         if not self.data_manager.connected:
             return
@@ -108,53 +197,53 @@ class AlertsWidget(ttk.Frame):
     def check_alerts(self):
         """Vérifie et génère les alertes de risque"""
         try:
-            # Obtenir les informations actuelles
-            account_info = self.data_manager.account_info
-            if not account_info:
+            # Instantané calculé par le thread de rafraîchissement (aucun calcul sur le thread Tk)
+            snapshot = self.data_manager.account_snapshot
+            if not snapshot:
                 return
             
             current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             
-            # Vérifier le niveau de marge
-            margin_pct = self.data_manager.get_current_margin_percentage()
-            if margin_pct > self.alert_thresholds['margin_pct']:
+            # Valeurs surveillées (la durée moyenne ne sert qu'au-delà du seuil de D-Leverage)
+            thresholds = self.alert_thresholds
+            margin_pct = snapshot['margin_pct']
+            d_leverage = snapshot['d_leverage']
+            monthly_var = snapshot['monthly_var']
+            avg_duration = 0.0
+            if d_leverage > thresholds['d_leverage']:
+                avg_duration = self.data_manager.get_average_position_duration()
+            
+            # Décision en un seul appel; seuls les messages des alertes déclenchées sont formatés
+            flags, target_index, reduction_needed = _evaluate_alerts(
+                margin_pct, d_leverage, monthly_var, avg_duration,
+                thresholds['margin_pct'], thresholds['d_leverage'], thresholds['var_monthly'])
+            if not flags:
+                return
+            
+            # Niveau de marge
+            if flags & ALERT_MARGIN:
                 self.add_alert(current_time, "RISQUE", "Niveau de marge élevé", f"{margin_pct:.1f}%")
                 self.suggest_optimization("RÉDUCTION DE MARGE", 
-                    f"Le niveau de marge actuel ({margin_pct:.1f}%) dépasse le seuil recommandé de {self.alert_thresholds['margin_pct']}%. "
+                    f"Le niveau de marge actuel ({margin_pct:.1f}%) dépasse le seuil recommandé de {thresholds['margin_pct']}%. "
                     f"Envisagez de réduire les positions ou d'augmenter votre capital pour améliorer votre sécurité de trading.")
             
-            # Vérifier le D-Leverage
-            d_leverage = self.data_manager.calculate_d_leverage()
-            if d_leverage > self.alert_thresholds['d_leverage']:
+            # D-Leverage, avec la cible selon la durée moyenne des positions
+            if flags & ALERT_D_LEVERAGE:
                 self.add_alert(current_time, "RISQUE", "D-Leverage élevé", f"{d_leverage:.2f}")
                 
-                # Déterminer le D-Leverage cible selon la durée moyenne des positions
-                avg_duration = self.data_manager.get_average_position_duration()
-                
-                if avg_duration < 30:  # Scalping
-                    target_d_leverage = 16.25
-                    category = "Scalping (<30min)"
-                elif avg_duration < 60:  # Intraday
-                    target_d_leverage = 13
-                    category = "Intraday (30-60min)"
-                else:  # Swing
-                    target_d_leverage = 9.75
-                    category = "Swing (>60min)"
-                
-                if d_leverage > target_d_leverage:
-                    reduction_needed = (d_leverage - target_d_leverage) / d_leverage * 100
+                if flags & ALERT_D_LEVERAGE_TARGET:
+                    target_d_leverage, category = _D_LEVERAGE_TARGETS[target_index]
                     self.suggest_optimization("OPTIMISATION D-LEVERAGE", 
                         f"Votre D-Leverage actuel ({d_leverage:.2f}) dépasse le seuil recommandé de {target_d_leverage} "
                         f"pour la durée moyenne de vos positions ({avg_duration:.0f} min - {category}). "
                         f"Une réduction d'environ {reduction_needed:.1f}% du volume total serait nécessaire pour atteindre le niveau optimal. "
                         f"Réduisez progressivement vos positions pour éviter une exposition excessive au risque.")
             
-            # Vérifier la VaR mensuelle
-            monthly_var = self.data_manager.calculate_monthly_var()
-            if monthly_var > self.alert_thresholds['var_monthly']:
+            # VaR mensuelle
+            if flags & ALERT_VAR:
                 self.add_alert(current_time, "RISQUE", "VaR mensuelle élevée", f"{monthly_var:.2f}%")
                 self.suggest_optimization("RÉDUCTION DE LA VAR", 
-                    f"Votre VaR mensuelle ({monthly_var:.2f}%) est supérieure au seuil configuré de {self.alert_thresholds['var_monthly']}%. "
+                    f"Votre VaR mensuelle ({monthly_var:.2f}%) est supérieure au seuil configuré de {thresholds['var_monthly']}%. "
                     f"Envisagez de diversifier davantage votre portefeuille ou de réduire l'exposition sur les instruments volatils.")
             
             # TODO: Ajouter d'autres vérifications (perte quotidienne, drawdown, etc.)
@@ -173,26 +262,15 @@ class AlertsWidget(ttk.Frame):
             value (str): Valeur associée à l'alerte
         """
         try:
-            # Insérer en haut de la liste
-            self.alerts_tree.insert("", 0, values=(timestamp, alert_type, message, value))
-            
-            # Colorer selon le type d'alerte
-            if alert_type == "RISQUE":
-                self.alerts_tree.item(self.alerts_tree.get_children()[0], tags=("risk",))
-            elif alert_type == "ATTENTION":
-                self.alerts_tree.item(self.alerts_tree.get_children()[0], tags=("warning",))
-            elif alert_type == "INFO":
-                self.alerts_tree.item(self.alerts_tree.get_children()[0], tags=("info",))
-            
-            # Configurer les tags pour la coloration
-            self.alerts_tree.tag_configure("risk", foreground="red")
-            self.alerts_tree.tag_configure("warning", foreground="orange")
-            self.alerts_tree.tag_configure("info", foreground="blue")
+            # Insérer en haut de la liste, colorée selon le type d'alerte
+            tag = _ALERT_TAGS.get(alert_type)
+            iid = self.alerts_tree.insert("", 0, values=(timestamp, alert_type, message, value),
+                                          tags=(tag,) if tag else ())
+            self._alert_iids.appendleft(iid)
             
             # Limiter le nombre d'alertes affichées
-            if len(self.alerts_tree.get_children()) > 50:
-                last = self.alerts_tree.get_children()[-1]
-                self.alerts_tree.delete(last)
+            if len(self._alert_iids) > MAX_ALERTS:
+                self.alerts_tree.delete(self._alert_iids.pop())
         except Exception as e:
             self.logger.exception("Erreur lors de l'ajout d'une alerte")
     
@@ -205,34 +283,26 @@ class AlertsWidget(ttk.Frame):
             message (str): Message détaillé de la suggestion
         """
         try:
-            # Insérer au début avec timestamp
+            # Ajouter au début avec timestamp (les plus anciennes au-delà de la limite sont écartées)
             timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            full_message = f"[{timestamp}] {title}:\n{message}\n\n"
-            
-            self.optim_text.insert("1.0", full_message)
-            
-            # Limiter la taille du texte (conserver les 10 dernières suggestions)
-            all_text = self.optim_text.get("1.0", tk.END)
-            suggestions = all_text.split("\n\n")
-            
-            if len(suggestions) > 10:
-                # Reconstruire le texte avec seulement les 10 premières suggestions
-                new_text = "\n\n".join(suggestions[:10])
-                self.optim_text.delete("1.0", tk.END)
-                self.optim_text.insert("1.0", new_text)
+            self._suggestions.appendleft((f"[{timestamp}] {title}", f":\n{message}\n\n"))
             
-            # Appliquer des tags pour la mise en forme
-            self.optim_text.tag_add("title", "1.0", f"1.{len(timestamp) + len(title) + 3}")
-            self.optim_text.tag_configure("title", font=('TkDefaultFont', 9, 'bold'))
+            # Réécrire la zone de texte en un seul appel, titres en gras
+            chunks = []
+            for header, body in self._suggestions:
+                chunks.extend((header, "title", body, ()))
+            self.optim_text.delete("1.0", tk.END)
+            self.optim_text.insert("1.0", *chunks)
             
         except Exception as e:
             self.logger.exception("Erreur lors de l'ajout d'une suggestion d'optimisation")
     
     def clear_alerts(self):
         """Efface toutes les alertes"""
-        for item in self.alerts_tree.get_children():
-            self.alerts_tree.delete(item)
+        self.alerts_tree.delete(*self._alert_iids)
+        self._alert_iids.clear()
     
     def clear_optimizations(self):
         """Efface toutes les suggestions d'optimisation"""
+        self._suggestions.clear()
         self.optim_text.delete("1.0", tk.END)
\ No newline at end of file
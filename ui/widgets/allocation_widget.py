@@ -8,12 +8,22 @@ Widget d'allocation pour MT5 Trading Analyzer
 import tkinter as tk
 from tkinter import ttk
 import logging
+import time
+from types import SimpleNamespace
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from ui.widgets.chart_canvas import DebouncedFigureCanvas
 from matplotlib.figure import Figure
 
+# Direction des positions indexée par leur type MT5 (0 = achat, 1 = vente)
+_DIRECTIONS = np.array(['BUY', 'SELL'], dtype=object)
+
+# Catégories de durée des positions (en minutes), dans l'ordre d'affichage
+_DURATION_BINS = [-np.inf, 30, 60, 1440, np.inf]
+_DURATION_LABELS = ["< 30 min (Scalping)", "30-60 min (Intraday)",
+                    "1-24 h (Day Trading)", "> 24 h (Swing/Position)"]
+
 class AllocationWidget(ttk.Frame):
     """Widget affichant la répartition des allocations"""
     
@@ -32,6 +42,27 @@ class AllocationWidget(ttk.Frame):
         # Type de vue sélectionné
         self.view_type_var = tk.StringVar(value="Symbole")
         
+        # Artistes de la vue par symbole, modifiés sur place tant que les symboles affichés
+        # ne changent pas (None quand le graphique a été effacé ou tracé par une autre vue)
+        self._alloc_symbols = None
+        self._alloc_bars = None
+        self._alloc_labels = None
+        self._exposure_pie = None
+        
+        # Fond du graphique d'allocation sans les barres, capturé à chaque rendu complet
+        # pour redessiner seulement les barres (blit) quand l'échelle ne change pas
+        self._alloc_bg = None
+        
+        # Mise à jour programmée sur la boucle Tk (regroupe les demandes rapprochées)
+        self._update_pending = False
+        
+        # (version des positions, vue) du dernier tracé, None après un effacement
+        self._last_update_key = None
+        
+        # Tableaux dérivés des positions partagés par les trois vues, recalculés
+        # seulement quand la version des positions change
+        self._cached = None
+        
         self.create_widgets()
     
     def create_widgets(self):
@@ -64,8 +95,9 @@ class AllocationWidget(ttk.Frame):
         
         self.allocation_figure = Figure(figsize=(5, 4), dpi=100)
         self.allocation_plot = self.allocation_figure.add_subplot(111)
-        self.allocation_canvas = FigureCanvasTkAgg(self.allocation_figure, allocation_frame)
+        self.allocation_canvas = DebouncedFigureCanvas(self.allocation_figure, allocation_frame)
         self.allocation_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.allocation_canvas.mpl_connect("draw_event", self._on_allocation_draw)
         
         # Graphique de répartition par exposition (droite)
         exposure_frame = ttk.LabelFrame(right_frame, text="Exposition")
@@ -73,24 +105,43 @@ class AllocationWidget(ttk.Frame):
         
         self.exposure_figure = Figure(figsize=(5, 4), dpi=100)
         self.exposure_plot = self.exposure_figure.add_subplot(111)
-        self.exposure_canvas = FigureCanvasTkAgg(self.exposure_figure, exposure_frame)
+        self.exposure_canvas = DebouncedFigureCanvas(self.exposure_figure, exposure_frame)
         self.exposure_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
     
     def update(self, event=None):
         """
-        Met à jour les graphiques d'allocation
+        Demande la mise à jour des graphiques d'allocation
+        Les demandes reçues avant que la boucle Tk ne soit inactive donnent un seul tracé
         
         Args:
             event: Événement Tkinter (non utilisé directement)
         """
+        if not self._update_pending:
+            self._update_pending = True
+            self.after_idle(self._flush_update)
+    
+    def _flush_update(self):
+        """Exécute la mise à jour programmée"""
+        self._update_pending = False
+        self._do_update()
+    
+    def _do_update(self):
+        """Met à jour les graphiques d'allocation"""
         if not self.data_manager.connected or self.data_manager.positions is None:
             self.clear_charts()
             return
         
         try:
-            # Mettre à jour les graphiques selon le type de vue sélectionné
+            # Rien à faire si les positions et la vue n'ont pas changé depuis le dernier tracé
             view_type = self.view_type_var.get()
+            update_key = (self.data_manager.get_data_versions()["positions"], view_type)
+            if update_key == self._last_update_key:
+                return
+            # Mémorisée avant le tracé: un effacement en cas d'erreur la remet à None
+            self._last_update_key = update_key
+            self._prepare_positions(update_key[0])
             
+            # Mettre à jour les graphiques selon le type de vue sélectionné
             if view_type == "Symbole":
                 self.update_symbol_allocation()
             elif view_type == "Direction":
@@ -104,29 +155,43 @@ class AllocationWidget(ttk.Frame):
             self.logger.exception("Erreur lors de la mise à jour des graphiques d'allocation")
             self.clear_charts()
     
+    def _prepare_positions(self, version):
+        """
+        Calcule une fois par version des positions les tableaux utilisés par les vues
+        (self._cached vaut None en l'absence de positions)
+        
+        Args:
+            version (int): Version des positions dans le gestionnaire de données
+        """
+        if self._cached is not None and self._cached.version == version:
+            return
+        
+        df = self.data_manager.positions
+        if df is None or df.empty:
+            self._cached = None
+            return
+        
+        size = df['volume'].to_numpy(dtype=np.float64) * df['price_current'].to_numpy(dtype=np.float64)
+        codes, symbols = pd.factorize(df['symbol'].to_numpy())
+        self._cached = SimpleNamespace(version=version, df=df, size=size, type_arr=df['type'].to_numpy(),
+                                       codes=codes, symbols=symbols)
+    
     def update_symbol_allocation(self):
         """Met à jour les graphiques d'allocation par symbole"""
         try:
             # Vérifier si des positions sont disponibles
-            if self.data_manager.positions is None or self.data_manager.positions.empty:
+            if self._cached is None:
                 self.clear_charts()
                 return
             
-            # Copier les données de positions
-            positions_df = self.data_manager.positions.copy()
-            
-            # Calculer l'exposition par symbole (en tenant compte du sens)
-            positions_df['exposure'] = positions_df.apply(
-                lambda row: row['volume'] * row['price_current'] * (1 if row['type'] == 0 else -1),
-                axis=1
-            )
-            
-            # Calculer la taille des positions par symbole
-            positions_df['position_size'] = positions_df['volume'] * positions_df['price_current']
+            # Taille des positions et exposition (en tenant compte du sens), en tableaux locaux
+            cached = self._cached
+            size, codes, symbols = cached.size, cached.codes, cached.symbols
+            exposure_arr = np.where(cached.type_arr == 0, size, -size)
             
-            # Grouper par symbole
-            allocation = positions_df.groupby('symbol')['position_size'].sum()
-            exposure = positions_df.groupby('symbol')['exposure'].sum()
+            # Sommer par symbole: une passe bincount par colonne sur les codes des symboles
+            allocation = pd.Series(np.bincount(codes, weights=size, minlength=len(symbols)), index=symbols)
+            exposure = pd.Series(np.bincount(codes, weights=exposure_arr, minlength=len(symbols)), index=symbols)
             
             # Calculer les proportions pour l'allocation
             total_size = allocation.sum()
@@ -140,44 +205,72 @@ class AllocationWidget(ttk.Frame):
             total_long = exposure[exposure > 0].sum()
             total_short = abs(exposure[exposure < 0].sum())
             
-            # Tracer le graphique d'allocation
-            self.allocation_plot.clear()
-            bars = self.allocation_plot.bar(allocation_pct.index, allocation_pct.values, color='blue')
-            
-            # Ajouter les labels
-            for bar in bars:
-                height = bar.get_height()
-                self.allocation_plot.text(bar.get_x() + bar.get_width()/2., height + 1,
-                        f"{height:.1f}%", ha='center', va='bottom', rotation=0)
-            
-            # Formater le graphique d'allocation
-            self.allocation_plot.set_title("Répartition des allocations par symbole")
-            self.allocation_plot.set_ylabel("% de l'allocation totale")
-            self.allocation_plot.set_ylim(0, max(allocation_pct.values) * 1.2 if len(allocation_pct) > 0 else 100)
-            self.allocation_figure.autofmt_xdate(rotation=45)
-            self.allocation_figure.tight_layout()
-            self.allocation_canvas.draw()
-            
-            # Tracer le graphique d'exposition
-            self.exposure_plot.clear()
+            # Graphique d'allocation: hauteurs et labels des barres modifiés sur place
+            # si les mêmes symboles sont déjà affichés dans le même ordre
+            symbols = tuple(allocation_pct.index)
+            heights = allocation_pct.values
+            # Échelle arrondie à la dizaine pour que le fond reste valable d'une mise à jour à l'autre
+            y_max = np.ceil(max(heights) * 1.2 / 10) * 10
+            if symbols == self._alloc_symbols:
+                for bar, label, height in zip(self._alloc_bars, self._alloc_labels, heights):
+                    bar.set_height(height)
+                    label.set_position((bar.get_x() + bar.get_width()/2., height + 1))
+                    label.set_text(f"{height:.1f}%")
+                
+                if self._alloc_bg is not None and y_max == self.allocation_plot.get_ylim()[1]:
+                    # Même échelle: restaurer le fond et ne redessiner que les barres et leurs labels
+                    self.allocation_canvas.restore_region(self._alloc_bg)
+                    self._draw_alloc_artists()
+                    self.allocation_canvas.blit(self.allocation_plot.bbox)
+                else:
+                    self.allocation_plot.set_ylim(0, y_max)
+                    self.allocation_canvas.draw_idle()
+            else:
+                self._reset_allocation_plot()
+                
+                # Barres et labels animés: exclus du rendu complet, dessinés par _on_allocation_draw
+                bars = self.allocation_plot.bar(allocation_pct.index, heights, color='blue', animated=True)
+                
+                # Ajouter les labels
+                labels = []
+                for bar in bars:
+                    height = bar.get_height()
+                    labels.append(self.allocation_plot.text(bar.get_x() + bar.get_width()/2., height + 1,
+                            f"{height:.1f}%", ha='center', va='bottom', rotation=0, animated=True))
+                
+                # Formater le graphique d'allocation
+                self.allocation_plot.set_title("Répartition des allocations par symbole")
+                self.allocation_plot.set_ylabel("% de l'allocation totale")
+                self.allocation_plot.set_ylim(0, y_max)
+                self.allocation_figure.autofmt_xdate(rotation=45)
+                self.allocation_figure.tight_layout()
+                
+                self._alloc_symbols = symbols
+                self._alloc_bars = bars
+                self._alloc_labels = labels
+                self.allocation_canvas.draw_idle()
             
             # Créer les données pour le graphique d'exposition
             exposure_data = [total_long, total_short]
-            exposure_labels = ['Long', 'Short']
-            exposure_colors = ['green', 'red']
-            
-            # Graphique en camembert pour l'exposition
-            if sum(exposure_data) > 0:
-                self.exposure_plot.pie(exposure_data, labels=exposure_labels, colors=exposure_colors,
-                        autopct='%1.1f%%', startangle=90, shadow=True)
-                self.exposure_plot.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle
+            
+            # Graphique en camembert pour l'exposition: secteurs existants modifiés sur place
+            if sum(exposure_data) > 0 and self._exposure_pie is not None:
+                self._set_pie_fractions(*self._exposure_pie, exposure_data)
             else:
-                self.exposure_plot.text(0.5, 0.5, "Aucune exposition", ha='center', va='center')
+                # Tracer le graphique d'exposition
+                self._reset_exposure_plot()
                 
-            # Formater le graphique d'exposition
-            self.exposure_plot.set_title("Exposition Long/Short")
-            self.exposure_figure.tight_layout()
-            self.exposure_canvas.draw()
+                if sum(exposure_data) > 0:
+                    self._exposure_pie = self.exposure_plot.pie(exposure_data, labels=['Long', 'Short'],
+                            colors=['green', 'red'], autopct='%1.1f%%', startangle=90, shadow=True)
+                    self.exposure_plot.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle
+                else:
+                    self.exposure_plot.text(0.5, 0.5, "Aucune exposition", ha='center', va='center')
+                    
+                # Formater le graphique d'exposition
+                self.exposure_plot.set_title("Exposition Long/Short")
+                self.exposure_figure.tight_layout()
+            self.exposure_canvas.draw_idle()
             
         except Exception as e:
             self.logger.exception("Erreur lors de la mise à jour de l'allocation par symbole")
@@ -187,21 +280,18 @@ class AllocationWidget(ttk.Frame):
         """Met à jour les graphiques d'allocation par direction (buy/sell)"""
         try:
             # Vérifier si des positions sont disponibles
-            if self.data_manager.positions is None or self.data_manager.positions.empty:
+            if self._cached is None:
                 self.clear_charts()
                 return
             
-            # Copier les données de positions
-            positions_df = self.data_manager.positions.copy()
-            
-            # Ajouter une colonne pour la direction
-            positions_df['direction'] = positions_df['type'].map({0: 'BUY', 1: 'SELL'})
+            # Taille des positions
+            cached = self._cached
+            type_arr, size = cached.type_arr, cached.size
             
-            # Calculer la taille des positions par direction
-            positions_df['position_size'] = positions_df['volume'] * positions_df['price_current']
-            
-            # Grouper par direction
-            allocation = positions_df.groupby('direction')['position_size'].sum()
+            # Sommer par direction (seules les directions présentes sont conservées)
+            present = np.bincount(type_arr, minlength=2) > 0
+            direction_totals = np.bincount(type_arr, weights=size, minlength=2)
+            allocation = pd.Series(direction_totals[present], index=_DIRECTIONS[present])
             
             # Calculer les proportions
             total_size = allocation.sum()
@@ -212,7 +302,7 @@ class AllocationWidget(ttk.Frame):
             allocation_pct = (allocation / total_size * 100)
             
             # Tracer le graphique d'allocation
-            self.allocation_plot.clear()
+            self._reset_allocation_plot()
             bars = self.allocation_plot.bar(allocation_pct.index, allocation_pct.values, 
                               color=['green' if idx == 'BUY' else 'red' for idx in allocation_pct.index])
             
@@ -227,15 +317,18 @@ class AllocationWidget(ttk.Frame):
             self.allocation_plot.set_ylabel("% de l'allocation totale")
             self.allocation_plot.set_ylim(0, 100)
             self.allocation_figure.tight_layout()
-            self.allocation_canvas.draw()
+            self.allocation_canvas.draw_idle()
             
             # Tracer le graphique d'exposition par symbole et direction
-            self.exposure_plot.clear()
+            self._reset_exposure_plot()
             
-            # Calculer l'exposition par symbole et direction
-            pivot = pd.pivot_table(positions_df, values='position_size', 
-                                 index='symbol', columns='direction', 
-                                 aggfunc='sum', fill_value=0)
+            # Calculer l'exposition par symbole et direction (une colonne par direction présente)
+            codes, symbols = cached.codes, cached.symbols
+            is_buy = type_arr == 0
+            pivot = pd.DataFrame({
+                'BUY': np.bincount(codes, weights=np.where(is_buy, size, 0.0), minlength=len(symbols)),
+                'SELL': np.bincount(codes, weights=np.where(is_buy, 0.0, size), minlength=len(symbols)),
+            }, index=symbols).loc[:, present]
             
             # Trier par exposition totale
             pivot['total'] = pivot.sum(axis=1)
@@ -259,7 +352,7 @@ class AllocationWidget(ttk.Frame):
             else:
                 self.exposure_plot.text(0.5, 0.5, "Données insuffisantes", ha='center', va='center')
                 
-            self.exposure_canvas.draw()
+            self.exposure_canvas.draw_idle()
             
         except Exception as e:
             self.logger.exception("Erreur lors de la mise à jour de l'allocation par direction")
@@ -269,42 +362,26 @@ class AllocationWidget(ttk.Frame):
         """Met à jour les graphiques d'allocation par durée des positions"""
         try:
             # Vérifier si des positions sont disponibles
-            if self.data_manager.positions is None or self.data_manager.positions.empty:
+            if self._cached is None:
                 self.clear_charts()
                 return
             
-            # Copier les données de positions
-            positions_df = self.data_manager.positions.copy()
-            
-            # Calculer la durée de chaque position en minutes
-            now = pd.Timestamp.now()
-            positions_df['duration_minutes'] = positions_df['time'].apply(
-                lambda x: (now - pd.Timestamp.fromtimestamp(x)).total_seconds() / 60
-            )
-            
-            # Catégoriser les durées
-            def categorize_duration(minutes):
-                if minutes < 30:
-                    return "< 30 min (Scalping)"
-                elif minutes < 60:
-                    return "30-60 min (Intraday)"
-                elif minutes < 1440:  # 24 heures
-                    return "1-24 h (Day Trading)"
-                else:
-                    return "> 24 h (Swing/Position)"
+            # Calculer la durée de chaque position en minutes (heures d'ouverture en secondes epoch)
+            cached = self._cached
+            now = time.time()
+            duration_minutes = (now - cached.df['time'].to_numpy(dtype=np.float64)) / 60
             
-            positions_df['duration_category'] = positions_df['duration_minutes'].apply(categorize_duration)
+            # Catégoriser les durées en une seule passe (catégories ordonnées)
+            # Petit tableau limité aux colonnes agrégées, sans copier les positions
+            durations_df = pd.DataFrame({
+                'duration_category': pd.cut(duration_minutes, bins=_DURATION_BINS,
+                                            labels=_DURATION_LABELS, right=False),
+                'position_size': cached.size,
+                'direction': _DIRECTIONS[cached.type_arr],
+            })
             
-            # Calculer la taille des positions par catégorie de durée
-            positions_df['position_size'] = positions_df['volume'] * positions_df['price_current']
-            
-            # Grouper par catégorie de durée
-            allocation = positions_df.groupby('duration_category')['position_size'].sum()
-            
-            # Définir l'ordre des catégories
-            category_order = ["< 30 min (Scalping)", "30-60 min (Intraday)", 
-                             "1-24 h (Day Trading)", "> 24 h (Swing/Position)"]
-            allocation = allocation.reindex(category_order).dropna()
+            # Grouper par catégorie de durée (seules les catégories présentes, dans l'ordre des catégories)
+            allocation = durations_df.groupby('duration_category', observed=True)['position_size'].sum()
             
             # Calculer les proportions
             total_size = allocation.sum()
@@ -315,7 +392,7 @@ class AllocationWidget(ttk.Frame):
             allocation_pct = (allocation / total_size * 100)
             
             # Tracer le graphique d'allocation
-            self.allocation_plot.clear()
+            self._reset_allocation_plot()
             
             # Définir les couleurs pour chaque catégorie
             colors = ['#FF9999', '#66B2FF', '#99FF99', '#FFCC99']
@@ -342,21 +419,15 @@ class AllocationWidget(ttk.Frame):
             self.allocation_plot.set_title("Répartition des allocations par durée")
             self.allocation_plot.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle
             self.allocation_figure.tight_layout()
-            self.allocation_canvas.draw()
+            self.allocation_canvas.draw_idle()
             
             # Tracer le graphique d'exposition par catégorie et direction
-            self.exposure_plot.clear()
-            
-            # Ajouter une colonne pour la direction
-            positions_df['direction'] = positions_df['type'].map({0: 'BUY', 1: 'SELL'})
+            self._reset_exposure_plot()
             
             # Créer un tableau croisé par durée et direction
-            pivot = pd.pivot_table(positions_df, values='position_size', 
+            pivot = pd.pivot_table(durations_df, values='position_size', 
                                  index='duration_category', columns='direction', 
-                                 aggfunc='sum', fill_value=0)
-            
-            # Réordonner selon la catégorie
-            pivot = pivot.reindex(category_order).dropna(how='all')
+                                 aggfunc='sum', fill_value=0, observed=True)
             
             # Créer le graphique à barres empilées
             if not pivot.empty and len(pivot.columns) > 0:
@@ -372,22 +443,87 @@ class AllocationWidget(ttk.Frame):
             else:
                 self.exposure_plot.text(0.5, 0.5, "Données insuffisantes", ha='center', va='center')
                 
-            self.exposure_canvas.draw()
+            self.exposure_canvas.draw_idle()
             
         except Exception as e:
             self.logger.exception("Erreur lors de la mise à jour de l'allocation par durée")
             self.clear_charts()
     
+    def _reset_allocation_plot(self):
+        """Efface le graphique d'allocation et oublie les barres de la vue par symbole"""
+        self.allocation_plot.clear()
+        self._alloc_symbols = None
+        self._alloc_bars = None
+        self._alloc_labels = None
+        self._alloc_bg = None
+    
+    def _on_allocation_draw(self, event):
+        """
+        Après un rendu complet du graphique d'allocation, mémorise son fond
+        puis y dessine les barres animées de la vue par symbole
+        
+        Args:
+            event: Événement draw_event de matplotlib
+        """
+        if self._alloc_bars is None:
+            self._alloc_bg = None
+            return
+        self._alloc_bg = self.allocation_canvas.copy_from_bbox(self.allocation_plot.bbox)
+        self._draw_alloc_artists()
+    
+    def _draw_alloc_artists(self):
+        """Dessine les barres et les labels de la vue par symbole sur le canevas"""
+        for bar in self._alloc_bars:
+            self.allocation_plot.draw_artist(bar)
+        for label in self._alloc_labels:
+            self.allocation_plot.draw_artist(label)
+    
+    def _reset_exposure_plot(self):
+        """Efface le graphique d'exposition et oublie les secteurs de la vue par symbole"""
+        self.exposure_plot.clear()
+        self._exposure_pie = None
+    
+    @staticmethod
+    def _set_pie_fractions(wedges, texts, autotexts, values, startangle=90):
+        """
+        Met à jour sur place les secteurs d'un camembert et leurs textes (mêmes positions que pie())
+        
+        Args:
+            wedges (list): Secteurs retournés par pie()
+            texts (list): Labels des secteurs
+            autotexts (list): Pourcentages des secteurs
+            values (list): Nouvelles valeurs (de somme positive)
+            startangle (float): Angle de départ utilisé lors du tracé, en degrés
+        """
+        total = float(sum(values))
+        theta1 = startangle
+        for wedge, text, autotext, value in zip(wedges, texts, autotexts, values):
+            frac = value / total
+            theta2 = theta1 + 360 * frac
+            wedge.set_theta1(theta1)
+            wedge.set_theta2(theta2)
+            
+            # Labels au milieu de l'arc, à 1.1 et 0.6 rayon comme dans pie()
+            middle = np.deg2rad((theta1 + theta2) / 2)
+            x, y = np.cos(middle), np.sin(middle)
+            text.set_position((1.1 * x, 1.1 * y))
+            text.set_horizontalalignment('left' if x > 0 else 'right')
+            autotext.set_position((0.6 * x, 0.6 * y))
+            autotext.set_text('%1.1f%%' % (frac * 100))
+            theta1 = theta2
+    
     def clear_charts(self):
         """Efface les graphiques"""
+        self._last_update_key = None
+        
         # Graphique d'allocation
-        self.allocation_plot.clear()
+        self._reset_allocation_plot()
         self.allocation_plot.text(0.5, 0.5, "Aucune donnée disponible", ha='center', va='center')
         self.allocation_figure.tight_layout()
-        self.allocation_canvas.draw()
+        self.allocation_canvas.draw_idle()
         
         # Graphique d'exposition
-        self.exposure_plot.clear()
+        self._reset_exposure_plot()
         self.exposure_plot.text(0.5, 0.5, "Aucune donnée disponible", ha='center', va='center')
         self.exposure_figure.tight_layout()
-        self.exposure_canvas.draw()
\ No newline at end of file
+        self.exposure_canvas.draw_idle()
\ No newline at end of file
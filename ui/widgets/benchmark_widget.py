@@ -11,7 +11,7 @@ import logging
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from ui.widgets.chart_canvas import DebouncedFigureCanvas
 from matplotlib.figure import Figure
 from utils.constants import CHART_PERIODS, BENCHMARK_SYMBOLS
 import yfinance as yf
@@ -67,7 +67,7 @@ class BenchmarkWidget(ttk.Frame):
         self.plot = self.figure.add_subplot(111)
         
         # Intégration dans le widget Tkinter
-        self.canvas = FigureCanvasTkAgg(self.figure, chart_frame)
+        self.canvas = DebouncedFigureCanvas(self.figure, chart_frame)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         # Frame pour les métriques comparatives
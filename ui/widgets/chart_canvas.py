@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Canevas matplotlib pour Tkinter avec redimensionnement différé
+"""
+
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+# Délai sans nouvel événement <Configure> avant de redessiner la figure (ms)
+RESIZE_DEBOUNCE_MS = 150
+
+class DebouncedFigureCanvas(FigureCanvasTkAgg):
+    """
+    FigureCanvasTkAgg qui ne redessine la figure qu'une fois le redimensionnement terminé
+
+    Pendant le glissement du bord de la fenêtre, Tk émet un événement <Configure> par
+    mouvement et FigureCanvasTkAgg re-rastérise toute la figure à chacun d'eux. Seul le
+    dernier événement est traité, après RESIZE_DEBOUNCE_MS sans nouvel événement.
+    """
+
+    def __init__(self, figure, master=None):
+        """
+        Initialisation du canevas
+
+        Args:
+            figure (Figure): Figure matplotlib à afficher
+            master: Widget parent Tkinter
+        """
+        self._resize_after_id = None
+        super().__init__(figure, master)
+
+    def resize(self, event):
+        """
+        Programme le redimensionnement de la figure en annulant celui déjà en attente
+
+        Args:
+            event: Événement <Configure> de Tk
+        """
+        widget = self.get_tk_widget()
+        if self._resize_after_id is not None:
+            widget.after_cancel(self._resize_after_id)
+        self._resize_after_id = widget.after(RESIZE_DEBOUNCE_MS, self._apply_resize, event)
+
+    def _apply_resize(self, event):
+        """
+        Redimensionne et redessine la figure pour le dernier événement reçu
+
+        Args:
+            event: Événement <Configure> de Tk
+        """
+        self._resize_after_id = None
+        super().resize(event)
@@ -11,7 +11,7 @@ import logging
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from ui.widgets.chart_canvas import DebouncedFigureCanvas
 from matplotlib.figure import Figure
 from utils.constants import TRADING_CATEGORIES
 from analysis.metrics_interpreter import MetricsInterpreter
@@ -32,12 +32,8 @@ class DLeverageChartWidget(ttk.LabelFrame):
         self.data_manager = data_manager
         self.metrics_interpreter = MetricsInterpreter()
         
-        # Historique des valeurs de D-Leverage
-        self.d_leverage_history = {
-            "timestamp": [],
-            "value": [],
-            "avg_duration": []
-        }
+        # Historique des valeurs de D-Leverage, partagé via le gestionnaire de données
+        self.d_leverage_history = data_manager.d_leverage_history
         
         self.create_widgets()
     
@@ -78,7 +74,7 @@ class DLeverageChartWidget(ttk.LabelFrame):
         self.plot = self.figure.add_subplot(111)
         
         # Intégration dans le widget Tkinter
-        self.canvas = FigureCanvasTkAgg(self.figure, chart_frame)
+        self.canvas = DebouncedFigureCanvas(self.figure, chart_frame)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         
         # Panneau d'informations en dessous du graphique
@@ -104,24 +100,11 @@ class DLeverageChartWidget(ttk.LabelFrame):
             return
         
         try:
-            # Récupérer la valeur actuelle de D-Leverage
-            current_d_leverage = self.data_manager.calculate_d_leverage()
-            
-            # Récupérer la durée moyenne des positions
-            avg_duration = self.data_manager.get_average_position_duration()
-            
-            # Ajouter au historique
-            timestamp = pd.Timestamp.now()
-            self.d_leverage_history["timestamp"].append(timestamp)
-            self.d_leverage_history["value"].append(current_d_leverage)
-            self.d_leverage_history["avg_duration"].append(avg_duration)
-            
-            # Limiter la taille de l'historique (par exemple, 1000 points maximum)
-            max_history = 1000
-            if len(self.d_leverage_history["timestamp"]) > max_history:
-                self.d_leverage_history["timestamp"] = self.d_leverage_history["timestamp"][-max_history:]
-                self.d_leverage_history["value"] = self.d_leverage_history["value"][-max_history:]
-                self.d_leverage_history["avg_duration"] = self.d_leverage_history["avg_duration"][-max_history:]
+            # Historique commun aux widgets D-Leverage: la valeur courante n'y est
+            # calculée et ajoutée qu'une fois par nouvelle version des données
+            self.d_leverage_history = self.data_manager.get_d_leverage_history()
+            current_d_leverage = self.d_leverage_history["value"][-1]
+            avg_duration = self.d_leverage_history["avg_duration"][-1]
             
             # Mise à jour des labels d'information
             self.current_value_label.config(text=f"D-Leverage actuel: {current_d_leverage:.2f}")
@@ -302,7 +285,7 @@ class DLeverageChartWidget(ttk.LabelFrame):
             self.figure.autofmt_xdate()
             
             # Redessiner le graphique
-            self.canvas.draw()
+            self.canvas.draw_idle()
             
         except Exception as e:
             self.logger.exception("Erreur lors de la mise à jour du graphique D-Leverage")
@@ -313,7 +296,7 @@ class DLeverageChartWidget(ttk.LabelFrame):
         self.plot.clear()
         self.plot.set_title("Aucune donnée disponible")
         self.plot.grid(True, linestyle='--', alpha=0.7)
-        self.canvas.draw()
+        self.canvas.draw_idle()
         
         # Réinitialiser les informations
         self.current_value_label.config(text="D-Leverage actuel: -")
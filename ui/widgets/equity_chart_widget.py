@@ -10,7 +10,7 @@ from tkinter import ttk
 import logging
 import numpy as np
 import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from ui.widgets.chart_canvas import DebouncedFigureCanvas
 from matplotlib.figure import Figure
 from utils.constants import CHART_PERIODS
 from analysis.drawdown_analyzer import DrawdownAnalyzer
@@ -84,7 +84,7 @@ class EquityChartWidget(ttk.LabelFrame):
         self.plot = self.figure.add_subplot(111)
         
         # Intégration dans le widget Tkinter
-        self.canvas = FigureCanvasTkAgg(self.figure, chart_frame)
+        self.canvas = DebouncedFigureCanvas(self.figure, chart_frame)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         
         # Frame pour les informations statistiques
@@ -236,7 +236,7 @@ class EquityChartWidget(ttk.LabelFrame):
             self.figure.autofmt_xdate()
             
             # Redessiner le graphique
-            self.canvas.draw()
+            self.canvas.draw_idle()
             
             # Mettre à jour les statistiques
             self.update_statistics(equity_series)
@@ -305,7 +305,7 @@ class EquityChartWidget(ttk.LabelFrame):
         self.plot.clear()
         self.plot.set_title("Aucune donnée disponible")
         self.plot.grid(True, linestyle='--', alpha=0.7)
-        self.canvas.draw()
+        self.canvas.draw_idle()
         
         # Réinitialiser les statistiques
         self.period_return_label.config(text="Rendement sur la période: -")
@@ -10,7 +10,7 @@ from tkinter import ttk
 import logging
 import numpy as np
 import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from ui.widgets.chart_canvas import DebouncedFigureCanvas
 from matplotlib.figure import Figure
 from analysis.risk_score_calculator import RiskScoreCalculator
 
@@ -62,7 +62,7 @@ class RiskScoreWidget(ttk.LabelFrame):
         self.gauge_plot = self.gauge_figure.add_subplot(111)
         
         # Intégration dans le widget Tkinter
-        self.gauge_canvas = FigureCanvasTkAgg(self.gauge_figure, gauge_frame)
+        self.gauge_canvas = DebouncedFigureCanvas(self.gauge_figure, gauge_frame)
         self.gauge_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         
         # Frame inférieure pour les composantes du score
@@ -264,7 +264,7 @@ class RiskScoreWidget(ttk.LabelFrame):
             
             # Mettre à jour la figure
             self.gauge_figure.tight_layout()
-            self.gauge_canvas.draw()
+            self.gauge_canvas.draw_idle()
             
         except Exception as e:
             self.logger.exception("Erreur lors de la mise à jour de la jauge de risque")
@@ -318,7 +318,7 @@ class RiskScoreWidget(ttk.LabelFrame):
         # Effacer la jauge
         self.gauge_plot.clear()
         self.gauge_plot.axis('off')
-        self.gauge_canvas.draw()
+        self.gauge_canvas.draw_idle()
         
         # Effacer les barres des composantes
         for component, details in self.component_bars.items():
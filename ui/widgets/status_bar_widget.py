@@ -23,6 +23,9 @@ class StatusBarWidget(ttk.LabelFrame):
         super().__init__(parent, text="Statut", padding=5)
         self.logger = logging.getLogger(__name__)
         
+        # Identifiant de l'effacement programmé de la notification en cours
+        self._toast_after_id = None
+        
         self.create_widgets()
     
     def create_widgets(self):
@@ -41,6 +44,10 @@ class StatusBarWidget(ttk.LabelFrame):
         # Label pour l'horodatage
         self.timestamp_label = ttk.Label(status_frame, text=self.get_timestamp())
         self.timestamp_label.pack(side=tk.LEFT, padx=5)
+        
+        # Label pour les notifications temporaires (non modales)
+        self.toast_label = ttk.Label(status_frame, text="")
+        self.toast_label.pack(side=tk.RIGHT, padx=5)
     
     def set_status(self, message, status_type="info"):
         """
@@ -73,6 +80,32 @@ class StatusBarWidget(ttk.LabelFrame):
         except Exception as e:
             self.logger.exception("Erreur lors de la mise à jour du statut")
     
+    def show_toast(self, message, level="warning", timeout_ms=4000):
+        """
+        Affiche une notification temporaire dans la barre de statut, sans bloquer la boucle Tk
+        
+        Args:
+            message (str): Message à afficher
+            level (str): Niveau de la notification ("warning" ou "error")
+            timeout_ms (int): Durée d'affichage en millisecondes
+        """
+        try:
+            # Une nouvelle notification remplace la précédente et son délai d'effacement
+            if self._toast_after_id is not None:
+                self.after_cancel(self._toast_after_id)
+            
+            foreground = "red" if level == "error" else "orange"
+            self.toast_label.config(text=message, foreground=foreground)
+            self._toast_after_id = self.after(timeout_ms, self.clear_toast)
+            
+        except Exception as e:
+            self.logger.exception("Erreur lors de l'affichage de la notification")
+    
+    def clear_toast(self):
+        """Efface la notification temporaire"""
+        self._toast_after_id = None
+        self.toast_label.config(text="")
+    
     def get_timestamp(self):
         """
         Obtient l'horodatage actuel formaté
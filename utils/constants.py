@@ -91,6 +91,9 @@ REFRESH_INTERVALS = {
     "1h": 3600
 }
 
+# Correspondance inverse: intervalle en secondes -> clé de REFRESH_INTERVALS
+REFRESH_INTERVALS_INV = {v: k for k, v in REFRESH_INTERVALS.items()}
+
 # Ajoutez ce bloc aux constantes existantes du fichier utils/constants.py
 
 # Catégories de trading basées sur la durée